@@ -19,20 +19,35 @@ class CommunicatingAgent(Agent):
         message_service: The message service used to send and receive message (MessageService)
     """
 
-    def __init__(self, unique_id, model, name):
-        """ Create a new communicating agent.
+    def __init__(self, unique_id, model, name, retention_policy=None, message_service=None):
+        """ Create a new communicating agent, whose mailbox keeps its read messages according to retention_policy.
+
+        If no message service is given, the agent uses the one of its model (model.get_message_service()), or the
+        last created one if the model does not provide any. The agent registers itself to this message service.
         """
         super().__init__(unique_id, model)
         self.__identifier = unique_id
         self.__name = name
-        self.__mailbox = Mailbox()
-        self.__messages_service = MessageService.get_instance()
+        self.__mailbox = Mailbox(retention_policy)
+
+        if message_service is None:
+            get_message_service = getattr(model, "get_message_service", None)
+            message_service = get_message_service() if get_message_service is not None \
+                else MessageService.get_instance()
+        self.__messages_service = message_service
+        self.__messages_service.register_agent(self)
 
     def step(self):
         """ The step methods of the agent called by the scheduler at each time tick.
         """
         super().step()
 
+    def has_pending_work(self):
+        """ Return whether the agent has something to do at its next step, which is the case when it has unread
+        messages. Used by the EventDrivenActivation scheduler to decide whether to activate the agent again.
+        """
+        return self.__mailbox.has_new_messages()
+
     def get_name(self):
         """ Return the name of the communicating agent."""
         return self.__name
@@ -42,6 +57,11 @@ class CommunicatingAgent(Agent):
         """
         self.__mailbox.receive_messages(message)
 
+    def receive_message_batch(self, messages):
+        """ Receive several messages at once (called by the MessageService object) and store them in the mailbox.
+        """
+        self.__mailbox.receive_message_batch(messages)
+
     def send_message(self, message):
         """ Send message through the MessageService object.
         """
@@ -66,3 +86,8 @@ class CommunicatingAgent(Agent):
         """ Return a list of messages which have the same sender.
         """
         return self.__mailbox.get_messages_from_exp(exp)
+
+    def get_mailbox(self):
+        """ Return the mailbox of the agent.
+        """
+        return self.__mailbox
@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+
+from mesa.time import BaseScheduler
+
+
+class EventDrivenActivation(BaseScheduler):
+    """EventDrivenActivation class.
+    Class implementing a scheduler which only activates the agents that have pending work, in a random order.
+
+    An agent is awake when it is added to the scheduler, when the message service delivers a message to it (the
+    message service calls wake() at each delivery) and, after its step, as long as its has_pending_work() method
+    returns True. Agents without such a method stay awake at every step. The cost of a step therefore grows with the
+    number of active conversations rather than with the number of agents.
+
+    The agents activated during a step are the ones awake when the step starts. A message delivered to one of them
+    before its activation is proceeded in the same step; a message delivered to an agent after its activation, or to
+    an agent which was not awake when the step started, is proceeded in the next step.
+
+    attr:
+        awake_agents: the agents to activate at the next step, by unique id (dict)
+    """
+
+    def __init__(self, model):
+        """ Create a new, empty EventDrivenActivation scheduler.
+        """
+        super().__init__(model)
+        self.__awake_agents = dict()
+
+    def add(self, agent):
+        """ Add an agent to the scheduler, it is activated at the next step.
+        """
+        super().add(agent)
+        self.__awake_agents[agent.unique_id] = agent
+
+    def remove(self, agent):
+        """ Remove an agent from the scheduler.
+        """
+        super().remove(agent)
+        self.__awake_agents.pop(agent.unique_id, None)
+
+    def wake(self, agent):
+        """ Activate an agent of the scheduler at the next step (or later in the current step).
+        """
+        if agent.unique_id in self._agents:
+            self.__awake_agents[agent.unique_id] = agent
+
+    def get_awake_agent_count(self):
+        """ Return the number of agents to activate at the next step.
+        """
+        return len(self.__awake_agents)
+
+    def step(self):
+        """ Activate the awake agents once, in a random order.
+        """
+        awake_agents = self.__awake_agents
+        agents = list(awake_agents.values())
+        self.model.random.shuffle(agents)
+
+        for agent in agents:
+            # The agent may have been removed by one of the agents activated before it
+            if agent.unique_id not in self._agents:
+                continue
+
+            agent.step()
+
+            # The messages delivered to the agent during its own step keep it awake through has_pending_work()
+            has_pending_work = getattr(agent, "has_pending_work", None)
+            if has_pending_work is None or has_pending_work():
+                awake_agents[agent.unique_id] = agent
+            else:
+                awake_agents.pop(agent.unique_id, None)
+
+        self.steps += 1
+        self.time += 1
@@ -21,6 +21,8 @@ class Argument:
         couple_values_list:
     """
 
+    __slots__ = ('__decision', '__item', '__comparison_list', '__couple_values_list')
+
     def __init__(self, boolean_decision, item):
         """Creates a new Argument.
         """
@@ -30,10 +32,12 @@ class Argument:
         self.__couple_values_list: List['CoupleValue'] = []
 
     def add_premiss_comparison(self, val_1: Union[CriterionName, Value], val_2: Union[CriterionName, Value]):
-        """Adds a premiss comparison in the comparison list.
+        """Adds a premiss comparison in the comparison list. An argument holds at most one comparison.
         """
         if type(val_1) != type(val_2):
             raise Exception("Types mismatch")
+        if len(self.__comparison_list) != 0:
+            raise Exception("The argument already has a comparison")
 
         self.__comparison_list.append(Comparison(val_1, val_2))
 
@@ -44,8 +48,11 @@ class Argument:
         return self.__couple_values_list[0].get_criterion_name()
 
     def add_premiss_couple_values(self, criterion_name, value):
-        """Add a premiss couple values in the couple values list.
+        """Add a premiss couple values in the couple values list. An argument holds at most one couple values.
         """
+        if len(self.__couple_values_list) != 0:
+            raise Exception("The argument already has a couple values")
+
         self.__couple_values_list.append(CoupleValue(criterion_name, value))
 
     @staticmethod
@@ -66,45 +73,44 @@ class Argument:
         return Argument.list_supporting_proposal(item, preferences)[0]
 
     @staticmethod
-    def list_supporting_proposal(item: Item, preferences: Preferences) -> List[Tuple]:
+    def list_supporting_proposal(item: Item, preferences: Preferences) -> Tuple[Tuple, ...]:
         """
         Generate a list of premisses which can be used to support an item
         :param
             item: Item - name of the item
             preference: Preferences - preferences of an agent
-        :return: list of all premisses PRO an item (sorted by order of importance based on agent's preferences)
+        :return: tuple of all premisses PRO an item (sorted by order of importance based on agent's preferences)
         """
-        result = []
-        feelings_about_engine = preferences.get_criterion_value_for_item(item)
-        criterion_preferences = preferences.get_criterion_name_list()
-
-        for preference in criterion_preferences:
-            criterion_value = feelings_about_engine[preference]
-
-            if criterion_value == Value.VERY_GOOD or criterion_value == Value.GOOD:
-                result.append((preference, criterion_value))
-
-        return result
+        return preferences.get_supporting_premisses(item)
 
     @staticmethod
-    def list_attacking_proposal(item: Item, preferences: Preferences) -> List[Tuple]:
+    def list_attacking_proposal(item: Item, preferences: Preferences) -> Tuple[Tuple, ...]:
         """
         Generate a list of premisses which can be used to attack an item
         :param item: Item - name of the item
         :param preferences: Preferences - the preferences of an agent
-        :return: list of all premisses CON an item (sorted by order of importance based on preferences)
+        :return: tuple of all premisses CON an item (sorted by order of importance based on preferences)
         """
-        result = []
-        feelings_about_engine = preferences.get_criterion_value_for_item(item)
-        criterion_preferences = preferences.get_criterion_name_list()
+        return preferences.get_attacking_premisses(item)
 
-        for preference in criterion_preferences:
-            criterion_value = feelings_about_engine[preference]
+    def get_key(self) -> Tuple:
+        """
+        Returns a hashable key identifying the argument: (decision, item, couple value, comparison), the premisses
+        being None when missing. Items are interned and cache their hash, so keying on the item costs as much as keying
+        on its identifier.
+        """
+        couple_value = None
+        if len(self.__couple_values_list) != 0:
+            cp = self.__couple_values_list[0]
+            couple_value = (cp.get_criterion_name(), cp.get_value())
 
-            if criterion_value == Value.VERY_BAD or criterion_value == Value.BAD:
-                result.append((preference, criterion_value))
+        comparison = None
+        if len(self.__comparison_list) != 0:
+            # Criterion names and values are members of different enums, hence never equal to each other
+            comparison = (self.__comparison_list[0].get_best_criterion_name(),
+                          self.__comparison_list[0].get_worst_criterion_name())
 
-        return result
+        return self.__decision, self.__item, couple_value, comparison
 
     def __eq__(self, other) -> bool:
         """Overrides the default implementation"""
@@ -112,47 +118,13 @@ class Argument:
             return True
 
         if isinstance(other, Argument):
-            # Then we check if the the two objects talk about the same engine
-            if self.__item != other.__item:
-                return False
-
-            # We also need to verify the decision (ie the argument is in favor of the engine or not)
-            if self.__decision != other.__decision:
-                return False
-
-            # Then we check if the two objects have the same number of premisses of type comparison
-            if len(self.__comparison_list) == len(other.__comparison_list):
-                if len(self.__comparison_list) != 0:
-                    comparison_1 = self.__comparison_list[0]
-                    comparison_2 = other.__comparison_list[0]
-
-                    if type(comparison_1.get_best_criterion_name()) != type(comparison_2.get_best_criterion_name()):
-                        return False
-
-                    if comparison_1.get_best_criterion_name() != comparison_2.get_best_criterion_name():
-                        return False
-
-                    if comparison_1.get_worst_criterion_name() != comparison_2.get_worst_criterion_name():
-                        return False
-            else:
-                return False
-
-            # Finally we check if the two objects have the same number of premisses of type couple value
-            if len(self.__couple_values_list) == len(other.__couple_values_list):
-                if len(self.__couple_values_list) != 0:
-                    cp_1 = self.__couple_values_list[0]
-                    cp_2 = other.__couple_values_list[0]
-
-                    if cp_1.get_criterion_name() != cp_2.get_criterion_name():
-                        return False
-
-                    if cp_1.get_value() != cp_2.get_value():
-                        return False
-            else:
-                return False
-            return True
+            return self.get_key() == other.get_key()
         return NotImplemented
 
+    def __hash__(self):
+        """Returns the hash of the key of the argument, consistent with __eq__."""
+        return hash(self.get_key())
+
     def __str__(self):
         not_in_favor = 'not' if not self.__decision else ''
 
@@ -206,4 +178,19 @@ if __name__ == "__main__":
     argument_2.add_premiss_comparison(Value.VERY_GOOD, Value.GOOD)
 
     assert argument_1 != argument_2
-    print("[INFO] Testing type difference ... OK!")
\ No newline at end of file
+    print("[INFO] Testing type difference ... OK!")
+
+    second_premiss_rejected = False
+    try:
+        argument_2.add_premiss_comparison(CriterionName.CONSUMPTION, CriterionName.NOISE)
+    except Exception:
+        second_premiss_rejected = True
+    assert second_premiss_rejected
+    print("[INFO] Arguments hold at most one premiss of each kind... OK!")
+
+    argument_2 = Argument(True, Item("Porsche", "An engine from Stuttgart"))
+    argument_2.add_premiss_couple_values(CriterionName.ENVIRONMENT_IMPACT, Value.VERY_GOOD)
+    argument_2.add_premiss_comparison(CriterionName.CONSUMPTION, CriterionName.ENVIRONMENT_IMPACT)
+    assert argument_1.get_key() == argument_2.get_key()
+    assert len({argument_1, argument_2, Argument(True, engine)}) == 2
+    print("[INFO] Equal arguments share a key and a hash... OK!")
\ No newline at end of file
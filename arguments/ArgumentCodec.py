@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+from typing import Dict, List, Tuple, Union
+
+from arguments.Argument import Argument
+
+from preferences.CriterionName import CriterionName
+from preferences.Item import Item
+from preferences.ItemCatalog import ItemCatalog
+from preferences.Value import Value
+
+CRITERIA: List[CriterionName] = CriterionName.to_list()
+VALUES: List[Value] = Value.to_list()
+CRITERION_INDEX: Dict[CriterionName, int] = {criterion: index for index, criterion in enumerate(CRITERIA)}
+VALUE_INDEX: Dict[Value, int] = {value: index for index, value in enumerate(VALUES)}
+
+# Number of codes of each part of an argument, 0 standing for a missing premiss
+COUPLE_VALUE_CODES = 1 + len(CRITERIA) * len(VALUES)
+COMPARISON_CODES = 1 + len(CRITERIA) * len(CRITERIA) + len(VALUES) * len(VALUES)
+
+
+class ArgumentCodec:
+    """ArgumentCodec class.
+    This class maps each argument to a dense integer and back.
+
+    An argument is made of a decision, an item, an optional couple value (criterion, value) and an optional comparison
+    of two criteria or of two values. The local code of an argument (its code among the arguments about the same item)
+    is below LOCAL_CODES, and its code is item identifier * LOCAL_CODES + local code, the item identifier being given
+    by an ItemCatalog.
+
+    attr:
+        item_catalog: the catalog giving the identifier of each item
+    """
+
+    LOCAL_CODES = 2 * COUPLE_VALUE_CODES * COMPARISON_CODES
+
+    def __init__(self, item_catalog: ItemCatalog = None):
+        """Creates a new ArgumentCodec, the items being interned in item_catalog (a new one by default).
+        """
+        self.__item_catalog = item_catalog if item_catalog is not None else ItemCatalog()
+
+    def get_item_catalog(self) -> ItemCatalog:
+        """Returns the catalog giving the identifier of each item.
+        """
+        return self.__item_catalog
+
+    def encode_parts(self, argument: Argument) -> Tuple[int, int]:
+        """Returns the identifier of the item of an argument, interning the item if needed, and the local code of the
+        argument.
+        """
+        decision, item, couple_value, comparison = argument.get_key()
+        return self.__item_catalog.get_id(item), ArgumentCodec.__encode_local(decision, couple_value, comparison)
+
+    def find_parts(self, argument: Argument) -> Union[Tuple[int, int], None]:
+        """Returns the identifier of the item of an argument and the local code of the argument, or None if the item
+        has not been interned. Neither the catalog nor the item is modified.
+        """
+        decision, item, couple_value, comparison = argument.get_key()
+        item_id = self.__item_catalog.find_id(item)
+        if item_id is None:
+            return None
+        return item_id, ArgumentCodec.__encode_local(decision, couple_value, comparison)
+
+    @staticmethod
+    def __encode_local(decision: bool, couple_value: Union[Tuple, None], comparison: Union[Tuple, None]) -> int:
+        """Returns the local code of an argument from the parts of its key.
+        """
+        couple_value_code = 0
+        if couple_value is not None:
+            couple_value_code = 1 + CRITERION_INDEX[couple_value[0]] * len(VALUES) + VALUE_INDEX[couple_value[1]]
+
+        comparison_code = 0
+        if comparison is not None:
+            best, worst = comparison
+            if isinstance(best, CriterionName):
+                comparison_code = 1 + CRITERION_INDEX[best] * len(CRITERIA) + CRITERION_INDEX[worst]
+            else:
+                comparison_code = 1 + len(CRITERIA) * len(CRITERIA) + VALUE_INDEX[best] * len(VALUES) \
+                    + VALUE_INDEX[worst]
+
+        return ((1 if decision else 0) * COUPLE_VALUE_CODES + couple_value_code) * COMPARISON_CODES + comparison_code
+
+    def encode(self, argument: Argument) -> int:
+        """Returns the code of an argument.
+        """
+        item_id, local_code = self.encode_parts(argument)
+        return item_id * ArgumentCodec.LOCAL_CODES + local_code
+
+    def decode(self, code: int) -> Argument:
+        """Returns a new argument from its code.
+        """
+        item_id, local_code = divmod(code, ArgumentCodec.LOCAL_CODES)
+        decision_code, local_code = divmod(local_code, COUPLE_VALUE_CODES * COMPARISON_CODES)
+        couple_value_code, comparison_code = divmod(local_code, COMPARISON_CODES)
+
+        argument = Argument(decision_code == 1, self.__item_catalog.get_item(item_id))
+
+        if couple_value_code > 0:
+            criterion_index, value_index = divmod(couple_value_code - 1, len(VALUES))
+            argument.add_premiss_couple_values(CRITERIA[criterion_index], VALUES[value_index])
+
+        if comparison_code > 0:
+            comparison_code -= 1
+            if comparison_code < len(CRITERIA) * len(CRITERIA):
+                best, worst = divmod(comparison_code, len(CRITERIA))
+                argument.add_premiss_comparison(CRITERIA[best], CRITERIA[worst])
+            else:
+                best, worst = divmod(comparison_code - len(CRITERIA) * len(CRITERIA), len(VALUES))
+                argument.add_premiss_comparison(VALUES[best], VALUES[worst])
+
+        return argument
+
+
+if __name__ == '__main__':
+    diesel_engine = Item("Diesel Engine", "A super cool diesel engine")
+    electric_engine = Item("Electric Engine", "A very quiet engine")
+    codec = ArgumentCodec(ItemCatalog([diesel_engine, electric_engine]))
+
+    arguments = [Argument(True, diesel_engine), Argument(False, electric_engine)]
+
+    argument = Argument(True, electric_engine)
+    argument.add_premiss_couple_values(CriterionName.NOISE, Value.VERY_GOOD)
+    arguments.append(argument)
+
+    argument = Argument(False, diesel_engine)
+    argument.add_premiss_couple_values(CriterionName.ENVIRONMENT_IMPACT, Value.VERY_BAD)
+    argument.add_premiss_comparison(CriterionName.ENVIRONMENT_IMPACT, CriterionName.CONSUMPTION)
+    arguments.append(argument)
+
+    argument = Argument(True, electric_engine)
+    argument.add_premiss_couple_values(CriterionName.CONSUMPTION, Value.GOOD)
+    argument.add_premiss_comparison(Value.GOOD, Value.BAD)
+    arguments.append(argument)
+
+    codes = [codec.encode(argument) for argument in arguments]
+    assert len(set(codes)) == len(arguments)
+    assert all(0 <= code < 2 * ArgumentCodec.LOCAL_CODES for code in codes)
+    assert [codec.decode(code) for code in codes] == arguments
+    print("[INFO] Encoding and decoding arguments... OK!")
+
+    # Equal arguments share a code
+    argument = Argument(True, Item("Electric Engine", "A very quiet engine"))
+    argument.add_premiss_couple_values(CriterionName.NOISE, Value.VERY_GOOD)
+    assert codec.encode(argument) == codes[2]
+    assert codec.encode_parts(argument) == (1, codes[2] - ArgumentCodec.LOCAL_CODES)
+    assert codec.find_parts(argument) == codec.encode_parts(argument)
+    print("[INFO] Equal arguments share a code... OK!")
+
+    # Looking up an argument about an unknown item does not intern the item
+    flat6_engine = Item("Flat6", "A Porsche engine")
+    assert codec.find_parts(Argument(True, flat6_engine)) is None
+    assert flat6_engine.get_id() is None and len(codec.get_item_catalog()) == 2
+    print("[INFO] Looking up arguments about unknown items... OK!")
+
+    # Every local code is decoded into an argument with the same code
+    assert all(codec.encode(codec.decode(code)) == code for code in range(ArgumentCodec.LOCAL_CODES))
+    print("[INFO] The argument space is dense... OK!")
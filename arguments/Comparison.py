@@ -10,6 +10,8 @@ class Comparison:
         worst_criterion_name:
     """
 
+    __slots__ = ('__best_criterion_name', '__worst_criterion_name')
+
     def __init__(self, best_criterion_name, worst_criterion_name):
         """Creates a new comparison.
         """
@@ -10,6 +10,8 @@ class CoupleValue:
         value:
     """
 
+    __slots__ = ('__criterion_name', '__value')
+
     def __init__(self, criterion_name, value):
         """Creates a new couple value.
         """
@@ -1,5 +1,7 @@
 #!/usr/bin/env python3
 
+from mailbox.RetentionPolicy import KeepAllRetention
+
 
 class Mailbox:
     """Mailbox class.
@@ -7,52 +9,160 @@ class Mailbox:
 
     attr:
         unread_messages: The list of unread messages
-        read_messages: The list of read messages
+        read_chunks: The read messages, as the lists handed out by get_new_messages along with the sequence number
+        of their first message
+        read_messages_count: The number of read messages kept by the retention policy
+        evicted_sequence_numbers: The sequence numbers of the read messages evicted but still held by a chunk
+        next_sequence_number: The sequence number of the next received message
+        messages_by_performative: The messages kept for each performative, by sequence number
+        messages_by_exp: The messages kept for each sender, by sequence number
+        retention_policy: The policy deciding which read messages are kept
+        peak_retained_messages_count: The highest number of messages kept at once
      """
 
-    def __init__(self):
-        """ Create a new Mailbox.
+    def __init__(self, retention_policy=None):
+        """ Create a new Mailbox. Every read message is kept if no retention policy is given.
         """
         self.__unread_messages = []
-        self.__read_messages = []
+        self.__read_chunks = []
+        self.__read_messages_count = 0
+        self.__evicted_sequence_numbers = set()
+        self.__next_sequence_number = 0
+        self.__messages_by_performative = dict()
+        self.__messages_by_exp = dict()
+        self.__retention_policy = retention_policy if retention_policy is not None else KeepAllRetention()
+        self.__peak_retained_messages_count = 0
 
     def receive_messages(self, message):
         """ Receive a message and add it in the unread messages list.
         """
+        sequence_number = self.__next_sequence_number
+        self.__next_sequence_number += 1
+
         self.__unread_messages.append(message)
+        self.__messages_by_performative.setdefault(message.get_performative(), dict())[sequence_number] = message
+        self.__messages_by_exp.setdefault(message.get_exp(), dict())[sequence_number] = message
+
+        retained_messages_count = self.get_retained_messages_count()
+        if retained_messages_count > self.__peak_retained_messages_count:
+            self.__peak_retained_messages_count = retained_messages_count
+
+    def receive_message_batch(self, messages):
+        """ Receive several messages at once and add them in the unread messages list.
+        """
+        sequence_number = self.__next_sequence_number
+        self.__next_sequence_number += len(messages)
+        self.__unread_messages.extend(messages)
+
+        messages_by_performative = self.__messages_by_performative
+        messages_by_exp = self.__messages_by_exp
+        for message in messages:
+            messages_by_performative.setdefault(message.get_performative(), dict())[sequence_number] = message
+            messages_by_exp.setdefault(message.get_exp(), dict())[sequence_number] = message
+            sequence_number += 1
+
+        retained_messages_count = self.get_retained_messages_count()
+        if retained_messages_count > self.__peak_retained_messages_count:
+            self.__peak_retained_messages_count = retained_messages_count
 
     def get_new_messages(self):
         """ Return all the messages from unread messages list.
+
+        The unread list itself is handed out and stored as a chunk of the read history, once a new list has taken its
+        place. The returned list must therefore not be modified. A new empty list is returned if there is no unread
+        message.
         """
-        unread_messages = self.__unread_messages.copy()
+        unread_messages = self.__unread_messages
+        first_sequence_number = self.__next_sequence_number - len(unread_messages)
+
+        # The unread messages are the last ones received, their sequence numbers are consecutive
         if len(unread_messages) > 0:
-            for messages in unread_messages:
-                self.__read_messages.append(messages)
+            self.__unread_messages = []
+            self.__read_chunks.append((first_sequence_number, unread_messages))
+            self.__read_messages_count += len(unread_messages)
+        else:
+            unread_messages = []
+
+        evicted = self.__retention_policy.select_evicted(first_sequence_number, unread_messages)
+        if len(evicted) > 0:
+            for sequence_number, message in evicted:
+                self.__evict(sequence_number, message)
+
+            # Chunks are compacted once they hold more evicted messages than kept ones, so that memory stays
+            # proportional to the kept messages and the cost of compacting is amortized over the evictions
+            if len(self.__evicted_sequence_numbers) > self.__read_messages_count:
+                self.__compact_read_chunks()
 
-        self.__unread_messages.clear()
         return unread_messages
 
+    def __evict(self, sequence_number, message):
+        """ Forget a read message.
+        """
+        self.__evicted_sequence_numbers.add(sequence_number)
+        self.__read_messages_count -= 1
+
+        for index, key in [(self.__messages_by_performative, message.get_performative()),
+                           (self.__messages_by_exp, message.get_exp())]:
+            messages = index[key]
+            del messages[sequence_number]
+            if len(messages) == 0:
+                del index[key]
+
+    def __compact_read_chunks(self):
+        """ Rebuild the read chunks without the evicted messages, as runs of consecutive kept messages.
+        """
+        evicted_sequence_numbers = self.__evicted_sequence_numbers
+        compacted_chunks = []
+
+        for first_sequence_number, messages in self.__read_chunks:
+            run_start = None
+            for offset in range(len(messages) + 1):
+                is_kept = offset < len(messages) and first_sequence_number + offset not in evicted_sequence_numbers
+                if is_kept and run_start is None:
+                    run_start = offset
+                elif not is_kept and run_start is not None:
+                    compacted_chunks.append((first_sequence_number + run_start, messages[run_start:offset]))
+                    run_start = None
+
+        self.__read_chunks = compacted_chunks
+        self.__evicted_sequence_numbers = set()
+
+    def has_new_messages(self):
+        """ Return whether there are unread messages.
+        """
+        return len(self.__unread_messages) > 0
+
     def get_messages(self):
-        """ Return all the messages from both unread and read messages list.
+        """ Return all the messages kept from both unread and read messages list.
         """
         if len(self.__unread_messages) > 0:
             self.get_new_messages()
-        return self.__read_messages
+
+        evicted_sequence_numbers = self.__evicted_sequence_numbers
+        if len(evicted_sequence_numbers) == 0:
+            return [message for _, messages in self.__read_chunks for message in messages]
+
+        return [message
+                for first_sequence_number, messages in self.__read_chunks
+                for sequence_number, message in enumerate(messages, first_sequence_number)
+                if sequence_number not in evicted_sequence_numbers]
 
     def get_messages_from_performative(self, performative):
-        """ Return a list of messages which have the same performative.
+        """ Return a list of messages which have the same performative, in order of arrival.
         """
-        messages_from_performative = []
-        for message in self.__unread_messages + self.__read_messages:
-            if message.get_performative() == performative:
-                messages_from_performative.append(message)
-        return messages_from_performative
+        return list(self.__messages_by_performative.get(performative, dict()).values())
 
     def get_messages_from_exp(self, exp):
-        """ Return a list of messages which have the same sender.
+        """ Return a list of messages which have the same sender, in order of arrival.
+        """
+        return list(self.__messages_by_exp.get(exp, dict()).values())
+
+    def get_retained_messages_count(self):
+        """ Return the number of messages currently kept by the mailbox, read or unread.
+        """
+        return len(self.__unread_messages) + self.__read_messages_count
+
+    def get_peak_retained_messages_count(self):
+        """ Return the highest number of messages kept at once by the mailbox.
         """
-        messages_from_exp = []
-        for message in self.__unread_messages + self.__read_messages:
-            if message.get_exp() == exp:
-                messages_from_exp.append(message)
-        return messages_from_exp
+        return self.__peak_retained_messages_count
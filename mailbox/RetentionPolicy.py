@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+from abc import ABC, abstractmethod
+from collections import deque
+from typing import Callable, List, Tuple
+
+
+class RetentionPolicy(ABC):
+    """RetentionPolicy class.
+    Class deciding which read messages a mailbox keeps.
+
+    The mailbox hands each batch of newly read messages to its policy, along with the sequence number of the first
+    one (the others following consecutively), and evicts the (sequence number, message) entries the policy returns.
+    Policies are stateful: each mailbox needs its own instance. The limits are numbers of messages, whatever their size.
+    """
+
+    @abstractmethod
+    def select_evicted(self, first_sequence_number: int, messages: List) -> List[Tuple]:
+        """ Return the read entries to evict, given the messages that have just been read.
+        """
+
+
+class KeepAllRetention(RetentionPolicy):
+    """KeepAllRetention class.
+    Class keeping every read message, which is the default behaviour of a mailbox.
+    """
+
+    def select_evicted(self, first_sequence_number, messages):
+        """ Never evict anything.
+        """
+        return ()
+
+
+class KeepLastRetention(RetentionPolicy):
+    """KeepLastRetention class.
+    Class keeping only the last read messages.
+
+    attr:
+        max_messages: the number of read messages kept
+        entries: the read entries kept, oldest first
+    """
+
+    def __init__(self, max_messages: int):
+        """ Create a new KeepLastRetention.
+        """
+        self.__max_messages = max_messages
+        self.__entries = deque()
+
+    def select_evicted(self, first_sequence_number, messages):
+        """ Evict the oldest read messages beyond max_messages.
+        """
+        self.__entries.extend(enumerate(messages, first_sequence_number))
+
+        evicted = []
+        while len(self.__entries) > self.__max_messages:
+            evicted.append(self.__entries.popleft())
+        return evicted
+
+
+class KeepLastPerSenderRetention(RetentionPolicy):
+    """KeepLastPerSenderRetention class.
+    Class keeping only the last read messages of each sender.
+
+    attr:
+        max_messages: the number of read messages kept per sender
+        entries_by_exp: the read entries kept for each sender, oldest first
+    """
+
+    def __init__(self, max_messages: int):
+        """ Create a new KeepLastPerSenderRetention.
+        """
+        self.__max_messages = max_messages
+        self.__entries_by_exp = dict()
+
+    def select_evicted(self, first_sequence_number, messages):
+        """ Evict the oldest read messages of each sender beyond max_messages.
+        """
+        evicted = []
+        for entry in enumerate(messages, first_sequence_number):
+            entries = self.__entries_by_exp.setdefault(entry[1].get_exp(), deque())
+            entries.append(entry)
+            if len(entries) > self.__max_messages:
+                evicted.append(entries.popleft())
+        return evicted
+
+
+class DropEndedNegotiationRetention(RetentionPolicy):
+    """DropEndedNegotiationRetention class.
+    Class dropping the read messages of a sender once the negotiation with this sender has ended.
+
+    attr:
+        is_negotiation_ended: a function telling whether the negotiation with a sender has ended
+        entries_by_exp: the read entries kept for each sender whose negotiation is still ongoing
+    """
+
+    def __init__(self, is_negotiation_ended: Callable[[str], bool]):
+        """ Create a new DropEndedNegotiationRetention.
+        """
+        self.__is_negotiation_ended = is_negotiation_ended
+        self.__entries_by_exp = dict()
+
+    def select_evicted(self, first_sequence_number, messages):
+        """ Evict every read message of the senders whose negotiation has ended.
+        """
+        for entry in enumerate(messages, first_sequence_number):
+            self.__entries_by_exp.setdefault(entry[1].get_exp(), []).append(entry)
+
+        # A negotiation usually ends after its last message has been read, so every ongoing one is checked
+        evicted = []
+        for exp in [exp for exp in self.__entries_by_exp if self.__is_negotiation_ended(exp)]:
+            evicted.extend(self.__entries_by_exp.pop(exp))
+        return evicted
@@ -13,6 +13,8 @@ class Message:
         content: the content of the message
      """
 
+    __slots__ = ('__from_agent', '__to_agent', '__message_performative', '__content')
+
     def __init__(self, from_agent, to_agent, message_performative, content):
         """ Create a new message.
         """
@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+from typing import Dict, Iterable, List, Tuple
+
+import struct
+
+from arguments.Argument import Argument
+from arguments.ArgumentCodec import ArgumentCodec
+
+from message.Message import Message
+from message.MessagePerformative import MessagePerformative
+
+from preferences.Item import Item
+
+# Header of each message: sender id, receiver id, performative and payload tag
+HEADER = struct.Struct("<IIBB")
+# Number of messages at the start of a batch, length of a string payload
+COUNT = struct.Struct("<I")
+ITEM_PAYLOAD = struct.Struct("<I")
+ARGUMENT_PAYLOAD = struct.Struct("<Q")
+
+NONE_TAG = 0
+ITEM_TAG = 1
+ARGUMENT_TAG = 2
+STRING_TAG = 3
+
+PERFORMATIVES: Dict[int, MessagePerformative] = {performative.value: performative
+                                                 for performative in MessagePerformative}
+
+
+class MessageCodec:
+    """MessageCodec class.
+    Class encoding messages into bytes and back, e.g. to send them to another process or to store a trace to replay.
+
+    Each message is encoded as a header (sender id, receiver id, performative, payload tag) followed by its payload:
+    nothing for None, the identifier of an Item, the code of an Argument, or the length and the UTF-8 bytes of a str.
+    Agent names, items and arguments are thus encoded as integers: the decoding codec must be built from the same agent
+    names and an argument codec over the same item catalog. Names and items unknown to the codec are interned when
+    encoded, in which case the decoding side needs the names returned by get_agent_names().
+
+    attr:
+        agent_names: the agent names, indexed by their identifier
+        agent_ids: the identifier of each agent name
+        argument_codec: the codec of the arguments, giving the identifiers of the items through its catalog
+    """
+
+    def __init__(self, agent_names: Iterable[str] = (), argument_codec: ArgumentCodec = None):
+        """ Create a new MessageCodec, the agent names being identified by their position.
+        """
+        self.__agent_names: List[str] = []
+        self.__agent_ids: Dict[str, int] = dict()
+        self.__argument_codec = argument_codec if argument_codec is not None else ArgumentCodec()
+
+        for agent_name in agent_names:
+            self.get_agent_id(agent_name)
+
+    def get_agent_id(self, agent_name: str) -> int:
+        """ Return the identifier of an agent name, interning it if needed.
+        """
+        agent_id = self.__agent_ids.get(agent_name)
+        if agent_id is None:
+            agent_id = self.__agent_ids[agent_name] = len(self.__agent_names)
+            self.__agent_names.append(agent_name)
+        return agent_id
+
+    def get_agent_names(self) -> List[str]:
+        """ Return the agent names, indexed by their identifier.
+        """
+        return self.__agent_names
+
+    def __encode_payload(self, content) -> Tuple[int, object, int]:
+        """ Return the tag of a message content, the value written after the header and the size of the payload.
+        """
+        if content is None:
+            return NONE_TAG, None, 0
+        if isinstance(content, Item):
+            return ITEM_TAG, self.__argument_codec.get_item_catalog().get_id(content), ITEM_PAYLOAD.size
+        if isinstance(content, Argument):
+            return ARGUMENT_TAG, self.__argument_codec.encode(content), ARGUMENT_PAYLOAD.size
+        if isinstance(content, str):
+            encoded = content.encode("utf-8")
+            return STRING_TAG, encoded, COUNT.size + len(encoded)
+        raise TypeError("Cannot encode a message content of type {}".format(type(content).__name__))
+
+    def encode_batch(self, messages: Iterable[Message]) -> bytes:
+        """ Encode several messages into a single buffer, starting with the number of messages.
+        """
+        # The payloads are encoded first so that the buffer is allocated once
+        encoded_messages = []
+        size = COUNT.size
+        for message in messages:
+            tag, payload, payload_size = self.__encode_payload(message.get_content())
+            encoded_messages.append((self.get_agent_id(message.get_exp()), self.get_agent_id(message.get_dest()),
+                                     message.get_performative().value, tag, payload))
+            size += HEADER.size + payload_size
+
+        buffer = bytearray(size)
+        COUNT.pack_into(buffer, 0, len(encoded_messages))
+        offset = COUNT.size
+
+        for sender_id, receiver_id, performative, tag, payload in encoded_messages:
+            HEADER.pack_into(buffer, offset, sender_id, receiver_id, performative, tag)
+            offset += HEADER.size
+
+            if tag == ITEM_TAG:
+                ITEM_PAYLOAD.pack_into(buffer, offset, payload)
+                offset += ITEM_PAYLOAD.size
+            elif tag == ARGUMENT_TAG:
+                ARGUMENT_PAYLOAD.pack_into(buffer, offset, payload)
+                offset += ARGUMENT_PAYLOAD.size
+            elif tag == STRING_TAG:
+                COUNT.pack_into(buffer, offset, len(payload))
+                offset += COUNT.size
+                buffer[offset:offset + len(payload)] = payload
+                offset += len(payload)
+
+        return bytes(buffer)
+
+    def decode_batch(self, buffer) -> List[Message]:
+        """ Decode the messages of a buffer (bytes, bytearray or memoryview) produced by encode_batch.
+        """
+        view = memoryview(buffer)
+        agent_names = self.__agent_names
+        item_catalog = self.__argument_codec.get_item_catalog()
+
+        count, = COUNT.unpack_from(view, 0)
+        offset = COUNT.size
+        messages = []
+
+        for _ in range(count):
+            sender_id, receiver_id, performative, tag = HEADER.unpack_from(view, offset)
+            offset += HEADER.size
+
+            if tag == NONE_TAG:
+                content = None
+            elif tag == ITEM_TAG:
+                content = item_catalog.get_item(ITEM_PAYLOAD.unpack_from(view, offset)[0])
+                offset += ITEM_PAYLOAD.size
+            elif tag == ARGUMENT_TAG:
+                content = self.__argument_codec.decode(ARGUMENT_PAYLOAD.unpack_from(view, offset)[0])
+                offset += ARGUMENT_PAYLOAD.size
+            elif tag == STRING_TAG:
+                length, = COUNT.unpack_from(view, offset)
+                offset += COUNT.size
+                content = str(view[offset:offset + length], "utf-8")
+                offset += length
+            else:
+                raise ValueError("Unknown payload tag {}".format(tag))
+
+            messages.append(Message(agent_names[sender_id], agent_names[receiver_id], PERFORMATIVES[performative],
+                                    content))
+
+        return messages
+
+    def encode(self, message: Message) -> bytes:
+        """ Encode a single message.
+        """
+        return self.encode_batch([message])
+
+    def decode(self, buffer) -> Message:
+        """ Decode a single message encoded by encode.
+        """
+        return self.decode_batch(buffer)[0]
@@ -5,66 +5,146 @@ class MessageService:
     """MessageService class.
     Class implementing the message service used to dispatch messages between communicating agents.
 
-    Not intended to be created more than once: it's a singleton.
+    Each model owns its message service and hands it to its agents, so that several models can run in the same
+    process. The last created service is still available through get_instance() for compatibility.
 
     attr:
         scheduler: the scheduler of the sma (Scheduler)
         messages_to_proceed: the list of message to proceed mailbox of the agent (list)
+        agents_by_name: the index of the registered agents by name, the agents removed from the scheduler being dropped
+        when they are looked up (dict)
+        trace_sink: the sink tracing the dispatched messages, None to trace nothing (TraceSink)
+        sent_messages_count: the number of messages sent through the message service (int)
+        wake_agent: the wake method of the scheduler, called with each agent a message is delivered to, if the
+        scheduler has one (function)
     """
 
     __instance = None
 
     @staticmethod
     def get_instance():
-        """ Static access method.
+        """ Static access method, returning the last created message service.
         """
         return MessageService.__instance
 
-    def __init__(self, scheduler, instant_delivery=True):
+    def __init__(self, scheduler, instant_delivery=True, trace_sink=None):
         """ Create a new MessageService object.
         """
-        if MessageService.__instance is not None:
-            raise Exception("This class is a singleton!")
-        else:
-            MessageService.__instance = self
-            self.__scheduler = scheduler
-            self.__instant_delivery = instant_delivery
-            self.__messages_to_proceed = []
+        MessageService.__instance = self
+        self.__scheduler = scheduler
+        self.__instant_delivery = instant_delivery
+        self.__messages_to_proceed = []
+        self.__agents_by_name = dict()
+        self.__trace_sink = trace_sink
+        self.__sent_messages_count = 0
+        self.__wake_agent = getattr(scheduler, "wake", None)
 
     def set_instant_delivery(self, instant_delivery):
         """ Set the instant delivery parameter.
         """
         self.__instant_delivery = instant_delivery
 
+    def set_trace_sink(self, trace_sink):
+        """ Set the sink tracing the dispatched messages, None to trace nothing. The previous sink is flushed.
+        """
+        if self.__trace_sink is not None:
+            self.__trace_sink.flush()
+        self.__trace_sink = trace_sink
+
+    def close(self):
+        """ Close the trace sink, writing the messages it still buffers.
+        """
+        if self.__trace_sink is not None:
+            self.__trace_sink.close()
+
     def send_message(self, message):
         """ Dispatch message if instant delivery active, otherwise add the message to proceed list.
         """
+        self.__sent_messages_count += 1
+
         if self.__instant_delivery:
-            # We print the message
             self.dispatch_message(message)
 
         else:
             self.__messages_to_proceed.append(message)
 
+    def has_pending_messages(self):
+        """ Return whether some messages are waiting to be dispatched.
+        """
+        return len(self.__messages_to_proceed) > 0
+
+    def get_sent_messages_count(self):
+        """ Return the number of messages sent through the message service.
+        """
+        return self.__sent_messages_count
+
     def dispatch_message(self, message):
         """ Dispatch the message to the right agent.
         """
-        # We print the message
-        print(message)
-        self.find_agent_from_name(message.get_dest()).receive_message(message)
+        self.__trace(message)
+        agent = self.find_agent_from_name(message.get_dest())
+        agent.receive_message(message)
+
+        if self.__wake_agent is not None:
+            self.__wake_agent(agent)
 
     def dispatch_messages(self):
         """ Proceed each message received by the message service.
+
+        The list of messages to proceed is swapped for a new one before dispatching, so that messages sent during the
+        dispatch are kept for the next call. The messages are then delivered to each agent in one batch. If some
+        messages are sent to unknown agents, the other messages are delivered before a LookupError is raised.
+        """
+        messages_to_proceed = self.__messages_to_proceed
+        if len(messages_to_proceed) == 0:
+            return
+        self.__messages_to_proceed = []
+
+        messages_by_dest = dict()
+        for message in messages_to_proceed:
+            self.__trace(message)
+            messages_by_dest.setdefault(message.get_dest(), []).append(message)
+
+        unknown_dests = []
+        for dest, messages in messages_by_dest.items():
+            try:
+                agent = self.find_agent_from_name(dest)
+            except LookupError:
+                unknown_dests.append(dest)
+                continue
+
+            agent.receive_message_batch(messages)
+
+            if self.__wake_agent is not None:
+                self.__wake_agent(agent)
+
+        if len(unknown_dests) > 0:
+            raise LookupError("No agent named {} in the scheduler of the message service"
+                              .format(", ".join(unknown_dests)))
+
+    def __trace(self, message):
+        """ Trace a dispatched message, it is only formatted if the sink keeps it.
         """
-        if len(self.__messages_to_proceed) > 0:
-            for message in self.__messages_to_proceed:
-                self.dispatch_message(message)
+        if self.__trace_sink is not None:
+            self.__trace_sink.trace(message)
 
-        self.__messages_to_proceed.clear()
+    def register_agent(self, agent):
+        """ Index an agent by name, communicating agents register themselves when they are created. Messages are only
+        delivered to the agent while it is in the scheduler.
+        """
+        self.__agents_by_name[agent.get_name()] = agent
 
     def find_agent_from_name(self, agent_name):
-        """ Return the agent according to the agent name given.
+        """ Return the agent of the scheduler according to the agent name given.
         """
-        for agent in self.__scheduler.agents:
-            if agent.get_name() == agent_name:
-                return agent
+        agent = self.__agents_by_name.get(agent_name)
+
+        # The agent may have been removed from the scheduler since it registered
+        if agent is not None and self.__scheduler._agents.get(agent.unique_id) is not agent:
+            del self.__agents_by_name[agent_name]
+            agent = None
+
+        if agent is None:
+            raise LookupError("No agent named {} in the scheduler of the message service".format(agent_name))
+
+        return agent
@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+from abc import ABC, abstractmethod
+from collections import deque
+from typing import Iterable, List
+
+import atexit
+import sys
+
+
+class TraceSink(ABC):
+    """TraceSink class.
+    Class receiving the messages dispatched by the message service in order to trace them.
+
+    Not intended to be used on its own: the message service does not trace anything when it has no sink, and the
+    subclasses below only format a message when they actually keep it.
+    """
+
+    @abstractmethod
+    def trace(self, message):
+        """ Trace a dispatched message.
+        """
+
+    def flush(self):
+        """ Write the traced messages that are still buffered.
+        """
+        pass
+
+    def close(self):
+        """ Flush the sink and release its resources.
+        """
+        self.flush()
+
+
+class PrintTraceSink(TraceSink):
+    """PrintTraceSink class.
+    Class printing each traced message, as the message service used to do.
+
+    attr:
+        stream: the stream the messages are printed to (sys.stdout by default)
+    """
+
+    def __init__(self, stream=None):
+        """ Create a new PrintTraceSink.
+        """
+        self.__stream = stream
+
+    def trace(self, message):
+        """ Print the message.
+        """
+        print(message, file=self.__stream if self.__stream is not None else sys.stdout)
+
+
+class FilteredTraceSink(TraceSink):
+    """FilteredTraceSink class.
+    Class forwarding to another sink only the messages whose performative belongs to the traced levels.
+
+    attr:
+        sink: the sink the messages are forwarded to
+        performatives: the performatives of the traced messages
+    """
+
+    def __init__(self, sink, performatives: Iterable):
+        """ Create a new FilteredTraceSink.
+        """
+        self.__sink = sink
+        self.__performatives = frozenset(performatives)
+
+    def trace(self, message):
+        """ Forward the message if its performative is traced.
+        """
+        if message.get_performative() in self.__performatives:
+            self.__sink.trace(message)
+
+    def flush(self):
+        """ Flush the underlying sink.
+        """
+        self.__sink.flush()
+
+    def close(self):
+        """ Close the underlying sink.
+        """
+        self.__sink.close()
+
+
+class BufferedFileTraceSink(TraceSink):
+    """BufferedFileTraceSink class.
+    Class writing the traced messages to a file by chunks of buffer_size messages. The sink is closed when the
+    interpreter exits if it was not closed before, so that the buffered messages are not lost.
+
+    attr:
+        file: the file the messages are written to
+        buffer_size: the number of messages buffered before writing them
+        buffer: the messages that are not written yet
+    """
+
+    def __init__(self, path, buffer_size=1024):
+        """ Create a new BufferedFileTraceSink writing to the file at path.
+        """
+        self.__file = open(path, "w", encoding="utf-8")
+        self.__buffer_size = buffer_size
+        self.__buffer = []
+        atexit.register(self.close)
+
+    def trace(self, message):
+        """ Buffer the message, writing the buffer when it is full.
+        """
+        self.__buffer.append(message)
+        if len(self.__buffer) >= self.__buffer_size:
+            self.flush()
+
+    def flush(self):
+        """ Format and write the buffered messages in one call, doing nothing once the sink is closed.
+        """
+        if self.__file.closed:
+            return
+        if len(self.__buffer) > 0:
+            self.__file.write("".join(str(message) + "\n" for message in self.__buffer))
+            self.__buffer.clear()
+        self.__file.flush()
+
+    def close(self):
+        """ Flush the buffer and close the file, doing nothing if it is already closed.
+        """
+        if self.__file.closed:
+            return
+        self.flush()
+        self.__file.close()
+        atexit.unregister(self.close)
+
+
+class RingBufferTraceSink(TraceSink):
+    """RingBufferTraceSink class.
+    Class keeping in memory the last traced messages, which are only formatted when they are read.
+
+    attr:
+        messages: the last capacity traced messages
+    """
+
+    def __init__(self, capacity=1000):
+        """ Create a new RingBufferTraceSink.
+        """
+        self.__messages = deque(maxlen=capacity)
+
+    def trace(self, message):
+        """ Keep the message, dropping the oldest one if the buffer is full.
+        """
+        self.__messages.append(message)
+
+    def get_messages(self) -> List:
+        """ Return the last traced messages.
+        """
+        return list(self.__messages)
+
+    def get_lines(self) -> List[str]:
+        """ Return the last traced messages as strings.
+        """
+        return [str(message) for message in self.__messages]
@@ -1,40 +1,28 @@
-from typing import List, Tuple, Union
+from typing import Dict, List, Tuple, Union
 from preferences.Item import Item
 from arguments.Argument import Argument
+from arguments.ArgumentCodec import ArgumentCodec
+from negociation.NegotiationRecord import NegotiationRecord
 
 from preferences.CriterionName import CriterionName
 from preferences.Value import Value
 
 
 class Negotiation:
-    def __init__(self, agents: List[str]):
-        self._negotiations = Negotiation.initialize(agents)
-
-    @staticmethod
-    def initialize(agents_id: List[str]) -> dict:
+    def __init__(self, agents: List[str] = None, argument_codec: ArgumentCodec = None):
         """
-        This function aims to initialize the dictionary that will contain all the negotiation objects. Each negotiation
-        object is identified by the identifier of the two agents negotiating one or several engines.
+        Creates the container of the negotiation objects. Each negotiation object is identified by the identifiers of
+        the two agents negotiating one or several engines, and is only created once one of them writes in it.
 
         Params:
-            - agents_id (List): A list containing the identifiers of all the agents to construct the negotiations object.
-        Returns:
-            A dictionary containing several negotiation objects..
-
+            - agents (List): The identifiers of the agents, kept for compatibility as negotiations are created lazily.
+            - argument_codec (ArgumentCodec): The codec used to store the arguments as integers, it should share the
+            item catalog of the model (a codec with its own catalog by default).
         """
-        result = dict()
-        agents_size = len(agents_id)
-        for i in range(agents_size):
-            for j in range(i + 1, agents_size):
-                result[(agents_id[i], agents_id[j])] = {
-                    "initiator": None,
-                    "arguments": [],
-                    "accepted_engine": None,
-                    "close_agreements": [],
-                    "engines_mentioned": {}
-                }
-
-        return result
+        self._negotiations: Dict[Tuple, NegotiationRecord] = dict()
+        self._argument_codec = argument_codec if argument_codec is not None else ArgumentCodec()
+        self._open_negotiations_count = 0
+        self._ended_negotiations_count = 0
 
     @staticmethod
     def _get_tuple(agent_1: str, agent_2: str) -> Tuple:
@@ -50,6 +38,39 @@ class Negotiation:
         """
         return (agent_1, agent_2) if agent_1 < agent_2 else (agent_2, agent_1)
 
+    def _get_record(self, agent_1: str, agent_2: str) -> NegotiationRecord:
+        """
+        This function aims to return the negotiation object of two agents, creating it on first use.
+
+        Params:
+            - agent_1 (int): The identifier of one of the agents that is part of a specific negotiation T.
+            - agent_2 (int): The identifier of the other agent involved in the negotiation T.
+
+        Returns:
+             The negotiation object of the two agents.
+        """
+        tuple_ = Negotiation._get_tuple(agent_1, agent_2)
+        record = self._negotiations.get(tuple_)
+
+        if record is None:
+            record = NegotiationRecord()
+            self._negotiations[tuple_] = record
+
+        return record
+
+    def _find_record(self, agent_1: str, agent_2: str) -> Union[NegotiationRecord, None]:
+        """
+        This function aims to return the negotiation object of two agents without creating it.
+
+        Params:
+            - agent_1 (int): The identifier of one of the agents that is part of a specific negotiation T.
+            - agent_2 (int): The identifier of the other agent involved in the negotiation T.
+
+        Returns:
+             The negotiation object of the two agents, None if they have never negotiated.
+        """
+        return self._negotiations.get(Negotiation._get_tuple(agent_1, agent_2))
+
     def start_negotiation(self, initiator: str, interlocutor: str):
         """
         The purpose of this function is to start a negotiation between two agents to discuss engines. The negotiation
@@ -60,8 +81,11 @@ class Negotiation:
             - interlocutor (int): The identifier of the other agent involved in the newly created negotiation process.
 
         """
-        tuple_ = Negotiation._get_tuple(initiator, interlocutor)
-        self._negotiations[tuple_]["initiator"] = initiator
+        record = self._get_record(initiator, interlocutor)
+
+        if record.initiator is None:
+            self._open_negotiations_count += 1
+        record.initiator = initiator
 
     def add_argument(self, agent_1: str, agent_2: str, argument: Argument):
         """
@@ -74,10 +98,29 @@ class Negotiation:
              - argument (Argument): The argument that has been advanced by agent_1
 
         """
-        tuple_ = Negotiation._get_tuple(agent_1, agent_2)
-        conclusion, _ = Argument.argument_parsing(argument)
+        record = self._get_record(agent_1, agent_2)
+        item_id, local_code = self._argument_codec.encode_parts(argument)
+
+        record.arguments.append((agent_1, item_id * ArgumentCodec.LOCAL_CODES + local_code))
+        record.used_arguments[item_id] = record.used_arguments.get(item_id, 0) | (1 << local_code)
+
+    def get_arguments(self, agent_1: str, agent_2: str) -> List[Tuple[str, Argument]]:
+        """
+        This function aims to return the arguments advanced during the negotiation between two agents.
+
+        Params:
+            - agent_1 (int): The identifier of one of two agents involved in the negotiation T.
+            - agent_2 (int): The identifier of the second agent involved in the negotiation T.
+
+        Returns:
+            The arguments, in the order in which they were advanced, along with the identifier of the agent who
+            advanced them.
+        """
+        record = self._find_record(agent_1, agent_2)
+        if record is None:
+            return []
 
-        self._negotiations[tuple_]["arguments"].append((agent_1, argument))
+        return [(agent, self._argument_codec.decode(code)) for agent, code in record.arguments]
 
     def has_started_negotiation(self, agent_1: str, agent_2: str) -> bool:
         """
@@ -91,8 +134,8 @@ class Negotiation:
              A boolean indicating whether or not the two agents have started arguing about which engine they will
              retain in the end.
         """
-        tuple_ = Negotiation._get_tuple(agent_1, agent_2)
-        if self._negotiations[tuple_]["initiator"] is not None:
+        record = self._find_record(agent_1, agent_2)
+        if record is not None and record.initiator is not None:
             return True
 
         return False
@@ -107,8 +150,7 @@ class Negotiation:
             - engine (Item): The engine that has been retained by the two agents.
 
         """
-        tuple_ = Negotiation._get_tuple(agent_1, agent_2)
-        self._negotiations[tuple_]["accepted_engine"] = engine
+        self._get_record(agent_1, agent_2).accepted_engine = engine
 
     def accept_ending_negotiation(self, agent_1: str, agent_2: str):
         """
@@ -119,8 +161,14 @@ class Negotiation:
             - agent_1 (int): The identifier of one of two agents involved in the negotiation T.
             - agent_2 (int): The identifier of the second agent involved in the negotiation T.
         """
-        tuple_ = Negotiation._get_tuple(agent_1, agent_2)
-        self._negotiations[tuple_]["close_agreements"].append(agent_1)
+        record = self._get_record(agent_1, agent_2)
+        record.close_agreements.append(agent_1)
+
+        # We keep track of the negotiations that have just ended
+        if len(record.close_agreements) == 2:
+            self._ended_negotiations_count += 1
+            if record.initiator is not None:
+                self._open_negotiations_count -= 1
 
     def is_negotiation_ended(self, agent_1: str, agent_2: str) -> bool:
         """
@@ -134,8 +182,26 @@ class Negotiation:
             A boolean indicating whether or not the two agents have already agreed on a specific engine.
         """
 
-        tuple_ = Negotiation._get_tuple(agent_1, agent_2)
-        return len(self._negotiations[tuple_]["close_agreements"]) == 2
+        record = self._find_record(agent_1, agent_2)
+        return record is not None and len(record.close_agreements) == 2
+
+    def get_ended_negotiations_count(self) -> int:
+        """
+        This function aims to count the negotiations in which the two agents have agreed on a specific engine.
+
+        Returns:
+            The number of negotiations that have ended.
+        """
+        return self._ended_negotiations_count
+
+    def get_open_negotiations_count(self) -> int:
+        """
+        This function aims to count the negotiations that have started and have not ended yet.
+
+        Returns:
+            The number of ongoing negotiations.
+        """
+        return self._open_negotiations_count
 
     def is_argument_already_used(self, agent_1: str, agent_2: str, argument: Argument) -> bool:
         """
@@ -151,16 +217,17 @@ class Negotiation:
             A boolean indicating whether or not the argument advanced by agent_1 has already been used in the
             negotiation.
         """
-        tuple_ = Negotiation._get_tuple(agent_1, agent_2)
-        arguments = self._negotiations[tuple_]["arguments"]
+        record = self._find_record(agent_1, agent_2)
+        if record is None:
+            return False
 
-        for index in range(len(arguments)):
-            argument_bis: Argument = arguments[index][1]
+        # The argument is looked up without interning its item: an unknown item has never been argued about
+        parts = self._argument_codec.find_parts(argument)
+        if parts is None:
+            return False
 
-            if argument == argument_bis:
-                return True
-
-        return False
+        item_id, local_code = parts
+        return (record.used_arguments.get(item_id, 0) >> local_code) & 1 == 1
 
     def add_engine(self, agent_1: str, agent_2: str, engine: Item):
         """
@@ -172,8 +239,7 @@ class Negotiation:
             - engine (Item): An engine that has just been discussed between the two agents.
 
         """
-        tuple_ = Negotiation._get_tuple(agent_1, agent_2)
-        self._negotiations[tuple_]["engines_mentioned"][agent_1] = engine
+        self._get_record(agent_1, agent_2).engines_mentioned[agent_1] = engine
 
     def get_engine_proposed_by_interlocutor(self, agent_1: str, agent_2: str) -> Union[Item, None]:
         """
@@ -187,13 +253,11 @@ class Negotiation:
             The engine proposed by agent_1.
 
         """
-        tuple_ = Negotiation._get_tuple(agent_1, agent_2)
+        record = self._find_record(agent_1, agent_2)
+        if record is None:
+            return None
 
-        for agent, engine_ in self._negotiations[tuple_]["engines_mentioned"].items():
-            if agent == agent_2:
-                return engine_
-
-        return None
+        return record.engines_mentioned.get(agent_2)
 
     def has_engine_been_proposed(self, agent_1: str, agent_2: str, engine: Item) -> bool:
         """
@@ -210,13 +274,8 @@ class Negotiation:
 
         """
 
-        tuple_ = Negotiation._get_tuple(agent_1, agent_2)
-
-        for agent, engine_ in self._negotiations[tuple_]["engines_mentioned"].items():
-
-            if engine_ == engine:
-                return True
-        return False
+        record = self._find_record(agent_1, agent_2)
+        return record is not None and engine in record.engines_mentioned.values()
 
 
 if __name__ == '__main__':
@@ -224,15 +283,16 @@ if __name__ == '__main__':
     item = Item("Electric Engine", "An engine that works with electricity")
     negotiations = Negotiation(agents)
 
-    # Testing structure of the dictionary
+    # Testing structure of the dictionary, negotiations are created on first use
     dict_ = negotiations._negotiations
-    assert len(list(dict_.keys())) == len(agents)
+    assert len(list(dict_.keys())) == 0
 
     print("[INFO] Structure of the dictionary is correct ... OK!")
     # Trying to start a negotiation
     negotiations.start_negotiation(agents[0], agents[1])
 
-    assert dict_[(agents[0], agents[1])]["initiator"] == agents[0]
+    assert len(list(dict_.keys())) == 1
+    assert dict_[(agents[0], agents[1])].initiator == agents[0]
     print("[INFO] Starting a negotiation with Alice... OK!")
 
     # Trying to add an argument
@@ -246,7 +306,8 @@ if __name__ == '__main__':
     negotiations.add_argument(agents[0], agents[1], argument_1)
     negotiations.add_argument(agents[0], agents[1], argument_2)
 
-    assert len(dict_[(agents[0], agents[1])]["arguments"])
+    assert len(dict_[(agents[0], agents[1])].arguments)
+    assert negotiations.get_arguments(agents[1], agents[0]) == [(agents[0], argument_1), (agents[0], argument_2)]
     print("[INFO] Adding an argument to the list... OK!")
 
     # Testing function to determine if a negotiation has started with a specific interlocutor
@@ -254,6 +315,7 @@ if __name__ == '__main__':
     res_2 = negotiations.has_started_negotiation(agents[0], agents[1])
     assert res is False
     assert res_2 is True
+    assert negotiations.get_open_negotiations_count() == 1
     print("[INFO] Function has_started_negotiation works correctly... OK!")
 
     # Testing ending a negotiation
@@ -261,6 +323,8 @@ if __name__ == '__main__':
     negotiations.accept_ending_negotiation(agents[1], agents[0])
 
     assert negotiations.is_negotiation_ended(agents[0], agents[1]) is True
+    assert negotiations.get_ended_negotiations_count() == 1
+    assert negotiations.get_open_negotiations_count() == 0
     print("[INFO] Negotiation has ended successfully... OK!")
 
     # Testing non redundancy of arguments
@@ -268,17 +332,26 @@ if __name__ == '__main__':
     assert resp is True
     resp = negotiations.is_argument_already_used(agents[0], agents[1], argument_2)
     assert resp is True
+    argument_3 = Argument(False, item)
+    argument_3.add_premiss_couple_values(CriterionName.ENVIRONMENT_IMPACT, Value.VERY_BAD)
+    argument_3.add_premiss_comparison(CriterionName.ENVIRONMENT_IMPACT, CriterionName.NOISE)
+    resp = negotiations.is_argument_already_used(agents[0], agents[1], argument_3)
+    assert resp is False
+    flat6_engine = Item("Flat6", "A Porsche engine")
+    resp = negotiations.is_argument_already_used(agents[0], agents[1], Argument(True, flat6_engine))
+    assert resp is False and flat6_engine.get_id() is None
     print("[INFO] Detecting redundancy in arguments... OK!")
 
     # Checking the function to determiner if an engine has already been discussed
+    negotiations.add_engine(agents[0], agents[1], item)
     resp = negotiations.has_engine_been_proposed(agents[0], agents[1], item)
     assert resp is True
     resp = negotiations.has_engine_been_proposed(agents[0], agents[2], item)
     assert resp is False
+    assert len(list(dict_.keys())) == 1
     print("[INFO] An agent can check if an engine has already been mentioned... OK!")
 
     # Checking that we can retrieve the engine proposed by an agent
-    negotiations.add_engine(agents[0], agents[1], item)
     item_proposed_by_agent_0 = negotiations.get_engine_proposed_by_interlocutor(agents[1], agents[0])
     assert item_proposed_by_agent_0 == item
     print("[INFO] An agent can retrieve the engine that the other proposed ... OK!")
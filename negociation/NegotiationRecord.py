@@ -0,0 +1,31 @@
+from typing import Dict, List, Tuple, Union
+from preferences.Item import Item
+
+
+class NegotiationRecord:
+    """NegotiationRecord class.
+    This class stores the state of the negotiation between two agents.
+
+    attr:
+        initiator: the identifier of the agent that started the negotiation (None until it has started)
+        arguments: the codes of the arguments advanced during the negotiation, along with the identifier of the agent
+        who advanced them
+        used_arguments: the local codes of the arguments that have already been advanced, for each item identifier,
+        as an int used as a bitset of up to ArgumentCodec.LOCAL_CODES (2652) bits
+        accepted_engine: the engine that has been retained by the two agents
+        close_agreements: the identifiers of the agents in favor of ending the negotiation
+        engines_mentioned: the engine proposed by each agent
+    """
+
+    __slots__ = ('initiator', 'arguments', 'used_arguments', 'accepted_engine', 'close_agreements',
+                 'engines_mentioned')
+
+    def __init__(self):
+        """Creates a new NegotiationRecord for a negotiation that has not started yet.
+        """
+        self.initiator: Union[str, None] = None
+        self.arguments: List[Tuple] = []
+        self.used_arguments: Dict[int, int] = {}
+        self.accepted_engine: Union[Item, None] = None
+        self.close_agreements: List[str] = []
+        self.engines_mentioned: Dict[str, Item] = {}
@@ -5,6 +5,9 @@ class CriterionValue:
     """CriterionValue class.
     This class implements the CriterionValue object which associates an item with a CriterionName and a Value.
     """
+
+    __slots__ = ('__item', '__criterion_name', '__value')
+
     def __init__(self, item, criterion_name, value):
         """Creates a new CriterionValue.
         """
@@ -8,13 +8,19 @@ class Item:
     attr:
         name: the name of the item
         description: the description of the item
+        id: the identifier given by the ItemCatalog that interned the item (None if not interned)
+        hash: the hash of the item, computed once
      """
 
+    __slots__ = ('__name', '__description', '__id', '__hash')
+
     def __init__(self, name, description):
         """Creates a new Item.
         """
         self.__name = name
         self.__description = description
+        self.__id = None
+        self.__hash = hash((name, description))
 
     def __str__(self):
         """Returns Item as a String.
@@ -31,6 +37,16 @@ class Item:
         """
         return self.__description
 
+    def get_id(self):
+        """Returns the identifier of the item in its ItemCatalog, None if the item has not been interned.
+        """
+        return self.__id
+
+    def _set_id(self, identifier):
+        """Sets the identifier of the item (called by the ItemCatalog).
+        """
+        self.__id = identifier
+
     def get_value(self, preferences, criterion_name):
         """Returns the Value of the Item according to agent preferences.
         """
@@ -39,12 +55,7 @@ class Item:
     def get_score(self, preferences):
         """Returns the score of the Item according to agent preferences.
         """
-        criterion_weight = 100
-        sum_result = 0
-        for criterion_name in preferences.get_criterion_name_list():
-            sum_result = sum_result + criterion_weight * self.get_value(preferences, criterion_name).value
-            criterion_weight = criterion_weight / 2
-        return sum_result
+        return preferences.get_score(self)
 
     def __eq__(self, other) -> bool:
         """Overrides the default implementation"""
@@ -52,6 +63,9 @@ class Item:
             return True
 
         if isinstance(other, Item):
+            if self.__hash != other.__hash:
+                return False
+
             if self.__name != other.__name:
                 return False
 
@@ -60,3 +74,18 @@ class Item:
 
             return True
         return NotImplemented
+
+    def __hash__(self):
+        """Returns the hash of the item, consistent with __eq__."""
+        return self.__hash
+
+    def __getstate__(self):
+        """Returns the state of the item to pickle. The hash is left out as string hashes differ between processes.
+        """
+        return self.__name, self.__description, self.__id
+
+    def __setstate__(self, state):
+        """Restores a pickled item, computing its hash again.
+        """
+        self.__name, self.__description, self.__id = state
+        self.__hash = hash((self.__name, self.__description))
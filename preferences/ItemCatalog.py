@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+from typing import Dict, Iterable, List, Union
+from preferences.Item import Item
+
+
+class ItemCatalog:
+    """ItemCatalog class.
+    This class interns items: equal items are represented by a single Item object with a dense integer identifier.
+
+    attr:
+        item_list: the interned items, indexed by their identifier
+        item_index: the identifier of each interned item
+    """
+
+    def __init__(self, item_list: Iterable[Item] = ()):
+        """Creates a new ItemCatalog and interns the given items.
+        """
+        self.__item_list: List[Item] = []
+        self.__item_index: Dict[Item, int] = dict()
+
+        for item in item_list:
+            self.intern(item)
+
+    def intern(self, item: Item) -> Item:
+        """
+        Returns the interned item equal to the given one, interning the latter if it is unknown. An item which has
+        already been interned by another catalog is copied rather than shared.
+        """
+        identifier = self.__item_index.get(item)
+        if identifier is not None:
+            return self.__item_list[identifier]
+
+        if item.get_id() is not None:
+            item = Item(item.get_name(), item.get_description())
+
+        identifier = len(self.__item_list)
+        item._set_id(identifier)
+        self.__item_list.append(item)
+        self.__item_index[item] = identifier
+        return item
+
+    def get_id(self, item: Item) -> int:
+        """Returns the identifier of an item, interning it if needed.
+        """
+        identifier = self.__item_index.get(item)
+        if identifier is None:
+            identifier = self.intern(item).get_id()
+        return identifier
+
+    def find_id(self, item: Item) -> Union[int, None]:
+        """Returns the identifier of an item, or None if it has not been interned.
+        """
+        return self.__item_index.get(item)
+
+    def get_item(self, identifier: int) -> Item:
+        """Returns the interned item with the given identifier.
+        """
+        return self.__item_list[identifier]
+
+    def get_items(self) -> List[Item]:
+        """Returns the interned items, indexed by their identifier.
+        """
+        return self.__item_list
+
+    def __contains__(self, item: Item) -> bool:
+        return item in self.__item_index
+
+    def __len__(self) -> int:
+        return len(self.__item_list)
+
+
+if __name__ == '__main__':
+    diesel_engine = Item("Diesel Engine", "A super cool diesel engine")
+    electric_engine = Item("Electric Engine", "A very quiet engine")
+
+    catalog = ItemCatalog([diesel_engine, electric_engine])
+
+    assert len(catalog) == 2
+    assert diesel_engine.get_id() == 0 and electric_engine.get_id() == 1
+    assert catalog.get_item(1) is electric_engine
+    print("[INFO] Interning items... OK!")
+
+    # Equal items are represented by the same object
+    same_diesel_engine = Item("Diesel Engine", "A super cool diesel engine")
+    assert catalog.intern(same_diesel_engine) is diesel_engine
+    assert catalog.get_id(same_diesel_engine) == 0
+    assert same_diesel_engine.get_id() is None
+    assert catalog.find_id(Item("Flat6", "A Porsche engine")) is None and len(catalog) == 2
+    assert len({diesel_engine, same_diesel_engine, electric_engine}) == 2
+    print("[INFO] Equal items share an identifier and a hash... OK!")
+
+    # Items interned by another catalog are copied
+    other_catalog = ItemCatalog([electric_engine])
+    assert other_catalog.get_item(0) is not electric_engine
+    assert other_catalog.get_item(0) == electric_engine
+    assert electric_engine.get_id() == 1
+    print("[INFO] Items are not shared between catalogs... OK!")
+
+    # Pickled items do not carry their hash, which depends on the process
+    import pickle
+
+    pickled_engine = pickle.loads(pickle.dumps(diesel_engine))
+    assert pickled_engine.__getstate__() == ("Diesel Engine", "A super cool diesel engine", 0)
+    assert pickled_engine == diesel_engine and hash(pickled_engine) == hash(diesel_engine)
+    assert catalog.intern(pickled_engine) is diesel_engine
+    print("[INFO] Pickling items... OK!")
@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+from typing import List
+from preferences.CriterionName import CriterionName
+from preferences.CriterionValue import CriterionValue
+from preferences.Item import Item
+from preferences.Preferences import Preferences, CRITERIA, MISSING_VALUE
+from preferences.Value import Value
+
+import numpy as np
+
+
+class PopulationPreferences:
+    """PopulationPreferences class.
+    This class stacks the preferences of a population of agents in order to score every item for every agent at once.
+
+    attr:
+        item_list: the list of items, in the order of the columns of the score matrix
+        value_tensor: the agents x items x criteria array of values
+        weight_matrix: the agents x criteria array of criterion weights
+        score_matrix: the agents x items array of scores
+        ranking_matrix: for each agent, the indexes of the items sorted by decreasing score
+    """
+
+    def __init__(self, item_list: List[Item], value_tensor: np.ndarray, weight_matrix: np.ndarray):
+        """Creates a new PopulationPreferences object and computes the scores of the population.
+        """
+        self.__item_list = item_list
+        self.__value_tensor = value_tensor
+        self.__weight_matrix = weight_matrix
+
+        # One weighted reduction over the criteria axis for the whole population
+        values = np.where(value_tensor == MISSING_VALUE, 0, value_tensor)
+        self.__score_matrix = np.einsum('aic,ac->ai', values, weight_matrix)
+        self.__ranking_matrix = np.argsort(-self.__score_matrix, axis=1, kind='stable')
+
+    @staticmethod
+    def from_preferences(preferences_list: List[Preferences], item_list: List[Item]) -> 'PopulationPreferences':
+        """Stacks the preferences of several agents, the items being ordered as in item_list. The items of item_list
+        that an agent has no values for are scored 0 for this agent.
+        """
+        value_tensor = np.full((len(preferences_list), len(item_list), len(CRITERIA)), MISSING_VALUE, dtype=np.int8)
+        weight_matrix = np.zeros((len(preferences_list), len(CRITERIA)))
+
+        for agent_index, preferences in enumerate(preferences_list):
+            rows = [preferences.get_item_row(item) for item in item_list]
+            known_items = [index for index, row in enumerate(rows) if row is not None]
+            known_rows = [rows[index] for index in known_items]
+            value_tensor[agent_index, known_items] = preferences.get_value_matrix()[known_rows]
+            weight_matrix[agent_index] = preferences.get_criterion_weights()
+
+        return PopulationPreferences(item_list, value_tensor, weight_matrix)
+
+    def get_item_list(self) -> List[Item]:
+        """Returns the list of items, in the order of the columns of the score matrix.
+        """
+        return self.__item_list
+
+    def get_value_tensor(self) -> np.ndarray:
+        """Returns the agents x items x criteria array of values.
+        """
+        return self.__value_tensor
+
+    def get_score_matrix(self) -> np.ndarray:
+        """Returns the agents x items array of scores.
+        """
+        return self.__score_matrix
+
+    def get_ranking_matrix(self) -> np.ndarray:
+        """Returns, for each agent, the indexes of the items sorted by decreasing score.
+        """
+        return self.__ranking_matrix
+
+    def get_most_preferred_items(self) -> List[Item]:
+        """Returns the most preferred item of each agent.
+        """
+        return [self.__item_list[index] for index in self.__ranking_matrix[:, 0].tolist()]
+
+    def get_welfare(self) -> np.ndarray:
+        """Returns the utilitarian social welfare of each item, i.e. the sum of its scores over the population.
+        """
+        return self.__score_matrix.sum(axis=0)
+
+    def prime(self, preferences_list: List[Preferences]):
+        """Hands the scores computed for the population to the preferences they were built from, so that each agent
+        reads them instead of computing its own. Preferences whose items are not exactly the items of the population
+        are left untouched.
+        """
+        for agent_index, preferences in enumerate(preferences_list):
+            if not preferences.covers_all_items(self.__item_list):
+                continue
+
+            rows = [preferences.get_item_row(item) for item in self.__item_list]
+            scores = np.empty(len(rows))
+            scores[rows] = self.__score_matrix[agent_index]
+            preferences.set_scores(scores)
+
+
+if __name__ == '__main__':
+    diesel_engine = Item("Diesel Engine", "A super cool diesel engine")
+    electric_engine = Item("Electric Engine", "A very quiet engine")
+    engines = [diesel_engine, electric_engine]
+
+    preferences_list = []
+    for criteria, diesel_value in [(CRITERIA, Value.VERY_GOOD), (CRITERIA[::-1], Value.VERY_BAD)]:
+        preferences = Preferences()
+        preferences.set_criterion_name_list(list(criteria))
+        for criterion_name in CRITERIA:
+            preferences.add_criterion_value(CriterionValue(diesel_engine, criterion_name, diesel_value))
+            preferences.add_criterion_value(CriterionValue(electric_engine, criterion_name, Value.AVERAGE))
+        preferences_list.append(preferences)
+
+    # The third agent knows the items in another order
+    preferences = Preferences()
+    preferences.set_criterion_name_list(CRITERIA)
+    for engine in engines[::-1]:
+        for criterion_name in CRITERIA:
+            preferences.add_criterion_value(CriterionValue(engine, criterion_name, Value.GOOD))
+    preferences.add_criterion_value(CriterionValue(diesel_engine, CriterionName.NOISE, Value.VERY_GOOD))
+    preferences_list.append(preferences)
+
+    population = PopulationPreferences.from_preferences(preferences_list, engines)
+
+    assert population.get_score_matrix().shape == (3, 2)
+    for agent_index, preferences in enumerate(preferences_list):
+        for item_index, engine in enumerate(engines):
+            assert population.get_score_matrix()[agent_index, item_index] == engine.get_score(preferences)
+    print("[INFO] Batch scores match the scores of each agent... OK!")
+
+    assert population.get_most_preferred_items() == [diesel_engine, electric_engine, diesel_engine]
+    assert population.get_welfare().shape == (2,)
+    print("[INFO] Rankings of the population... OK!")
+
+    population.prime(preferences_list)
+    assert preferences_list[0].most_preferred(engines) == diesel_engine
+    assert preferences_list[1].most_preferred(engines) == electric_engine
+    assert preferences_list[2].most_preferred(engines) == diesel_engine
+
+    # Preferences holding other items keep computing their own scores
+    preferences_list[1].add_criterion_value(CriterionValue(Item("Flat6", "A Porsche engine"),
+                                                           CriterionName.NOISE, Value.GOOD))
+    population.prime(preferences_list)
+    assert preferences_list[1].most_preferred(engines) == electric_engine
+    print("[INFO] Priming the preferences with the batch scores... OK!")
+
+    # Items unknown to an agent are scored 0, and its preferences are not primed
+    flat6_engine = Item("Flat6", "A Porsche engine")
+    other_preferences = Preferences()
+    other_preferences.set_criterion_name_list(CRITERIA)
+    for engine in [diesel_engine, flat6_engine]:
+        other_preferences.add_criterion_value(CriterionValue(engine, CriterionName.NOISE, Value.GOOD))
+
+    population = PopulationPreferences.from_preferences([other_preferences], engines)
+    assert population.get_score_matrix()[0].tolist() == [diesel_engine.get_score(other_preferences), 0]
+    population.prime([other_preferences])
+    assert other_preferences.get_ranking() == [diesel_engine, flat6_engine]
+    print("[INFO] Stacking preferences about other items... OK!")
@@ -1,12 +1,25 @@
 #!/usr/bin/env python3
-from typing import List, Union
+from typing import Dict, List, Tuple, Union
 from preferences.CriterionName import CriterionName
 from preferences.CriterionValue import CriterionValue
 from preferences.Item import Item
 from preferences.Value import Value
 
+import numpy as np
 import random
 
+# Columns of the value matrix, one per criterion
+CRITERIA: List[CriterionName] = CriterionName.to_list()
+CRITERION_INDEX: Dict[CriterionName, int] = {criterion: column for column, criterion in enumerate(CRITERIA)}
+
+# Cells of the value matrix hold the integer value of a Value, MISSING_VALUE when not set
+VALUES: Dict[int, Value] = {value.value: value for value in Value}
+MISSING_VALUE = -1
+
+# Values of the premisses supporting and attacking an item
+PRO_VALUES = [Value.GOOD.value, Value.VERY_GOOD.value]
+CON_VALUES = [Value.VERY_BAD.value, Value.BAD.value]
+
 
 class Preferences:
     """Preferences class.
@@ -14,14 +27,106 @@ class Preferences:
 
     attr:
         criterion_name_list: the list of criterion name (ordered by importance)
-        criterion_value_list: the list of criterion value
+        criterion_ranks: the rank of each criterion column in the criterion name list
+        item_list: the list of items, in the order of the rows of the value matrix
+        item_index: the row of each item in the value matrix
+        value_matrix: the items x criteria matrix of values (MISSING_VALUE when a value is not set)
+        scores: the memoized score of each item (None until computed)
+        ranking: the memoized rows of the items sorted by decreasing score
+        ranks: the memoized rank of each row in the ranking
+        premisses: the memoized premisses supporting and attacking each item, by row
     """
 
     def __init__(self):
         """Creates a new Preferences object.
         """
         self.__criterion_name_list: List['CriterionName'] = []
-        self.__criterion_value_list: List['CriterionValue'] = []
+        self.__criterion_ranks: List[int] = [0] * len(CRITERIA)
+        self.__item_list: List['Item'] = []
+        self.__item_index: Dict[Item, int] = dict()
+        self.__value_matrix = np.full((0, len(CRITERIA)), MISSING_VALUE, dtype=np.int8)
+        self.__scores: Union[np.ndarray, None] = None
+        self.__ranking: Union[np.ndarray, None] = None
+        self.__ranks: Union[np.ndarray, None] = None
+        self.__premisses: Union[Tuple[List[Tuple], List[Tuple]], None] = None
+        self.__shares_items = False
+        self.__shares_values = False
+
+    @staticmethod
+    def build_item_index(item_list: List[Item]) -> Dict[Item, int]:
+        """Returns the index associating each item of a list to its position, as used by from_value_matrix.
+        """
+        return {item: row for row, item in enumerate(item_list)}
+
+    @staticmethod
+    def from_value_matrix(item_list: List[Item], criterion_name_list: List[CriterionName], value_matrix: np.ndarray,
+                          item_index: Dict[Item, int] = None) -> 'Preferences':
+        """
+        Creates a Preferences object from an items x criteria matrix of values, without creating any CriterionValue.
+
+        :param item_list: List[Item] - the items, in the order of the rows of the matrix
+        :param criterion_name_list: List[CriterionName] - the list of criterion name (ordered by importance)
+        :param value_matrix: np.ndarray - the matrix of values, used without copy until the preferences are modified
+        :param item_index: dict - the index of item_list built by build_item_index, it can be shared by several
+        preferences about the same items (the list and the index are copied before any modification)
+        :return: the new Preferences object
+        """
+        preferences = Preferences()
+        preferences.set_criterion_name_list(criterion_name_list)
+        preferences.__item_list = item_list
+        preferences.__item_index = item_index if item_index is not None else Preferences.build_item_index(item_list)
+        preferences.__value_matrix = value_matrix
+        preferences.__shares_items = True
+        preferences.__shares_values = True
+        return preferences
+
+    def _get_or_add_item_row(self, item: Item) -> int:
+        """Returns the row of an item in the value matrix, adding a new row if the item is unknown.
+        """
+        row = self.__item_index.get(item)
+
+        if row is None:
+            row = len(self.__item_list)
+
+            if self.__shares_items:
+                self.__item_list = list(self.__item_list)
+                self.__item_index = dict(self.__item_index)
+                self.__shares_items = False
+
+            # The matrix grows geometrically so that adding items stays amortized O(1)
+            if row == self.__value_matrix.shape[0]:
+                grown_matrix = np.full((max(8, 2 * row), len(CRITERIA)), MISSING_VALUE, dtype=np.int8)
+                grown_matrix[:row] = self.__value_matrix
+                self.__value_matrix = grown_matrix
+                self.__shares_values = False
+
+            self.__item_index[item] = row
+            self.__item_list.append(item)
+
+        return row
+
+    def get_item_row(self, item: Item) -> Union[int, None]:
+        """Returns the row of an item in the value matrix, None if the item is unknown.
+        """
+        return self.__item_index.get(item)
+
+    def _get_known_item_row(self, item: Item) -> int:
+        """Returns the row of an item in the value matrix, raising a LookupError if the item is unknown.
+        """
+        row = self.__item_index.get(item)
+        if row is None:
+            raise LookupError("The item {} has no values in the preferences".format(item))
+        return row
+
+    def get_item_list(self) -> List[Item]:
+        """Returns the list of items, in the order of the rows of the value matrix.
+        """
+        return self.__item_list
+
+    def get_value_matrix(self) -> np.ndarray:
+        """Returns the items x criteria matrix of values (a view, not a copy).
+        """
+        return self.__value_matrix[:len(self.__item_list)]
 
     def get_criterion_name_list(self):
         """Returns the list of criterion name.
@@ -31,41 +136,173 @@ class Preferences:
     def get_criterion_value_list(self) -> List[CriterionValue]:
         """Returns the list of criterion value.
         """
-        return self.__criterion_value_list
+        result = []
+
+        for item, values in zip(self.__item_list, self.get_value_matrix().tolist()):
+            for criterion_name, value in zip(CRITERIA, values):
+                if value != MISSING_VALUE:
+                    result.append(CriterionValue(item, criterion_name, VALUES[value]))
+
+        return result
 
     def set_criterion_name_list(self, criterion_name_list):
         """Sets the list of criterion name.
         """
         self.__criterion_name_list = criterion_name_list
 
+        # Criteria missing from the list are ranked after all the others
+        self.__criterion_ranks = [len(criterion_name_list)] * len(CRITERIA)
+        for rank, criterion_name in enumerate(criterion_name_list):
+            self.__criterion_ranks[CRITERION_INDEX[criterion_name]] = rank
+
+        self._invalidate_scores()
+
+    def get_criterion_rank(self, criterion_name: CriterionName) -> int:
+        """Returns the rank of a criterion in the list of criterion name (0 for the most important one).
+        """
+        return self.__criterion_ranks[CRITERION_INDEX[criterion_name]]
+
+    def get_criteria_preferred_to(self, criterion_name: CriterionName) -> List[CriterionName]:
+        """Returns the criteria strictly preferred to a given criterion, ordered by importance.
+        """
+        return self.__criterion_name_list[:self.get_criterion_rank(criterion_name)]
+
     def add_criterion_value(self, criterion_value):
-        """Adds a criterion value in the list.
+        """Adds a criterion value in the value matrix.
         """
-        self.__criterion_value_list.append(criterion_value)
+        row = self._get_or_add_item_row(criterion_value.get_item())
+        column = CRITERION_INDEX[criterion_value.get_criterion_name()]
+
+        # The matrix given to from_value_matrix may be shared, e.g. with the value tensor of the population
+        if self.__shares_values:
+            self.__value_matrix = self.__value_matrix.copy()
+            self.__shares_values = False
+
+        self.__value_matrix[row, column] = criterion_value.get_value().value
+        self._invalidate_scores()
+
+    def _invalidate_scores(self):
+        """Drops the memoized scores, ranking and premisses, they will be recomputed on the next read.
+        """
+        self.__scores = None
+        self.__ranking = None
+        self.__ranks = None
+        self.__premisses = None
+
+    def get_criterion_weights(self) -> np.ndarray:
+        """Returns the weight of each criterion column: 100 for the preferred criterion, then halved at each rank.
+        """
+        weights = np.zeros(len(CRITERIA))
+        criterion_weight = 100
+        for criterion_name in self.__criterion_name_list:
+            weights[CRITERION_INDEX[criterion_name]] = criterion_weight
+            criterion_weight = criterion_weight / 2
+        return weights
+
+    def _get_scores(self) -> np.ndarray:
+        """Returns the memoized score of each row of the value matrix, computing it if needed.
+        """
+        if self.__scores is None:
+            values = self.get_value_matrix()
+            self._memoize_scores(np.where(values == MISSING_VALUE, 0, values) @ self.get_criterion_weights())
+        return self.__scores
+
+    def _memoize_scores(self, scores: np.ndarray) -> np.ndarray:
+        """Memoizes the given scores along with the ranking they induce.
+        """
+        self.__scores = scores
+        self.__ranking = np.argsort(-scores, kind='stable')
+        self.__ranks = np.empty_like(self.__ranking)
+        self.__ranks[self.__ranking] = np.arange(len(self.__ranking))
+        return scores
+
+    def set_scores(self, scores: np.ndarray):
+        """Sets the scores of the items (in the order of the rows of the value matrix), e.g. when they have been
+        computed in batch for a whole population. They stay valid until the preferences are modified.
+        """
+        self._memoize_scores(np.asarray(scores, dtype=float))
+
+    def get_score(self, item: Item) -> float:
+        """Returns the score of an item according to the preferences.
+        """
+        return float(self._get_scores()[self._get_known_item_row(item)])
+
+    def get_ranking(self) -> List[Item]:
+        """Returns the items sorted by decreasing score.
+        """
+        self._get_scores()
+        return [self.__item_list[row] for row in self.__ranking.tolist()]
+
+    def get_item_rank(self, item: Item) -> int:
+        """Returns the rank of an item among all the items of the preferences (0 for the preferred one).
+        """
+        self._get_scores()
+        return int(self.__ranks[self._get_known_item_row(item)])
+
+    def _get_premisses(self) -> Tuple[List[Tuple], List[Tuple]]:
+        """Returns the memoized (criterion name, value) premisses supporting and attacking each item, by row, computing
+        them for every item at once if needed. The premisses of an item are ordered by importance.
+        """
+        if self.__premisses is None:
+            columns = [CRITERION_INDEX[criterion_name] for criterion_name in self.__criterion_name_list]
+            ranked_values = self.get_value_matrix()[:, columns]
+            rows_values = ranked_values.tolist()
+
+            premisses = []
+            for premiss_values in (PRO_VALUES, CON_VALUES):
+                premiss_table = np.isin(ranked_values, premiss_values)
+                premisses.append([
+                    tuple((self.__criterion_name_list[rank], VALUES[values[rank]])
+                          for rank in np.flatnonzero(premiss_table[row]).tolist())
+                    for row, values in enumerate(rows_values)
+                ])
+            self.__premisses = (premisses[0], premisses[1])
+        return self.__premisses
+
+    def get_supporting_premisses(self, item: Item) -> Tuple[Tuple[CriterionName, Value], ...]:
+        """Returns the (criterion name, value) premisses supporting an item (GOOD or VERY_GOOD values), ordered by
+        importance. The returned tuple is memoized and shared.
+        """
+        row = self.get_item_row(item)
+        return () if row is None else self._get_premisses()[0][row]
+
+    def get_attacking_premisses(self, item: Item) -> Tuple[Tuple[CriterionName, Value], ...]:
+        """Returns the (criterion name, value) premisses attacking an item (BAD or VERY_BAD values), ordered by
+        importance. The returned tuple is memoized and shared.
+        """
+        row = self.get_item_row(item)
+        return () if row is None else self._get_premisses()[1][row]
 
     def get_value(self, item, criterion_name):
         """Gets the value for a given item and a given criterion name.
         """
-        for value in self.__criterion_value_list:
-            if value.get_item() == item and value.get_criterion_name() == criterion_name:
-                return value.get_value()
-        return None
+        row = self.get_item_row(item)
+        if row is None:
+            return None
+
+        value = int(self.__value_matrix[row, CRITERION_INDEX[criterion_name]])
+        if value == MISSING_VALUE:
+            return None
+
+        return VALUES[value]
 
     def is_preferred_criterion(self, criterion_name_1, criterion_name_2):
         """Returns if a criterion 1 is preferred to the criterion 2.
         """
-        for criterion_name in self.__criterion_name_list:
-            if criterion_name == criterion_name_1:
-                return True
-            if criterion_name == criterion_name_2:
-                return False
+        return self.get_criterion_rank(criterion_name_1) <= self.get_criterion_rank(criterion_name_2)
 
     def get_criterion_value_for_item(self, item: Item) -> dict:
+        """Returns a dictionary associating each criterion name to the value of the item.
+        """
         result = dict()
 
-        for elmt in self.__criterion_value_list:
-            if elmt.get_item().get_name() == item.get_name():
-                result[elmt.get_criterion_name()] = elmt.get_value()
+        row = self.get_item_row(item)
+        if row is None:
+            return result
+
+        for criterion_name, value in zip(CRITERIA, self.__value_matrix[row].tolist()):
+            if value != MISSING_VALUE:
+                result[criterion_name] = VALUES[value]
 
         return result
 
@@ -74,42 +311,61 @@ class Preferences:
         """
         return item_1.get_score(self) > item_2.get_score(self)
 
-    def most_preferred(self, item_list: List[Item]) -> Item:
+    def covers_all_items(self, item_list: List[Item]) -> bool:
+        """Returns whether a list holds each item of the preferences exactly once, in any order, in which case the
+        memoized ranking can be used as is.
         """
-        Returns the most preferred item from a list.
-        """
-        scores = []
+        # The list may be shared with the caller, who could have added items without values since
+        if item_list is self.__item_list:
+            return len(item_list) == len(self.__item_index)
+        if len(item_list) != len(self.__item_list):
+            return False
 
-        # On trie les élèments pour apporter de l'aléatoire dans le max
-        random.shuffle(item_list)
+        rows = {self.__item_index.get(item) for item in item_list}
+        return None not in rows and len(rows) == len(self.__item_list)
 
-        for item in item_list:
-            scores.append(item.get_score(self))
+    def most_preferred(self, item_list: List[Item], rng: random.Random = None) -> Item:
+        """
+        Returns the most preferred item from a list (ties are broken at random with rng, the random module by default).
+        """
+        scores = self._get_scores()
+        rng = rng if rng is not None else random
 
-        return item_list[scores.index(max(scores))]
+        if self.covers_all_items(item_list):
+            best_score = scores[self.__ranking[0]]
+            best_rows = self.__ranking[:np.searchsorted(-scores[self.__ranking], -best_score, side='right')]
+            return self.__item_list[rng.choice(best_rows.tolist())]
 
-    def is_item_among_top_10_percent(self, item: Item, item_list: List[Item]) -> bool:
+        item_scores = scores[[self._get_known_item_row(item) for item in item_list]]
+        best_indexes = np.flatnonzero(item_scores == item_scores.max())
+        return item_list[rng.choice(best_indexes.tolist())]
+
+    def is_item_among_top_percent(self, item: Item, item_list: List[Item], percent: float) -> bool:
         """
-        Return whether a given item is among the top 10 percent of the preferred items.
+        Return whether a given item is among the top percent of the preferred items.
 
         :return: a boolean, True means that the item is among the favourite ones
         """
-        # To be completed
-        scores = []
+        if self.covers_all_items(item_list):
+            idx_item = self.get_item_rank(item)
+        else:
+            # On trie les scores de la sous-liste
+            item_scores = self._get_scores()[[self._get_known_item_row(item_) for item_ in item_list]]
+            ranking = np.argsort(-item_scores, kind='stable').tolist()
+            idx_item = [idx for idx, obj in enumerate(ranking) if item_list[obj] == item][0]
 
-        for item_ in item_list:
-            scores.append((item_, item_.get_score(self)))
+        # Calcul de la position pour le pourcentage demandé
+        max_pos = int(percent / 100 * len(item_list))
 
-        # On trie les scores
-        scores = sorted(scores, key=lambda x: x[1], reverse=True)
-
-        # On détermine l'index de l'item
-        idx_item = [idx for idx, obj in enumerate(scores) if obj[0] == item][0]
+        return idx_item <= max_pos
 
-        # Calcul de la position pour les 10 %
-        max_pos = int(0.10 * len(item_list))
+    def is_item_among_top_10_percent(self, item: Item, item_list: List[Item]) -> bool:
+        """
+        Return whether a given item is among the top 10 percent of the preferred items.
 
-        return idx_item <= max_pos
+        :return: a boolean, True means that the item is among the favourite ones
+        """
+        return self.is_item_among_top_percent(item, item_list, 10)
 
 
 if __name__ == '__main__':
@@ -170,3 +426,70 @@ if __name__ == '__main__':
     print('Is Electric Engine in top 10% preferences : {}'.
         format(
         agent_pref.is_item_among_top_10_percent(hydrogen_engine, [diesel_engine, electric_engine, hydrogen_engine])))
+
+    """test the value matrix"""
+    assert agent_pref.get_value_matrix().shape == (3, len(CRITERIA))
+    assert agent_pref.get_value(electric_engine, CriterionName.NOISE) == Value.VERY_GOOD
+    assert agent_pref.get_value(Item("Unknown Engine", ""), CriterionName.NOISE) is None
+    assert agent_pref.get_criterion_value_for_item(diesel_engine)[CriterionName.CONSUMPTION] == Value.GOOD
+    assert len(agent_pref.get_criterion_value_list()) == 3 * len(CRITERIA)
+    print("[INFO] Value matrix lookups... OK!")
+
+    """test the memoized scores and ranking"""
+    all_engines = [diesel_engine, electric_engine, hydrogen_engine]
+    assert diesel_engine.get_score(agent_pref) == 525.0
+    assert agent_pref.get_ranking()[0] == diesel_engine
+    assert agent_pref.get_item_rank(diesel_engine) == 0
+    assert agent_pref.most_preferred(all_engines) == diesel_engine
+    assert agent_pref.most_preferred([electric_engine, hydrogen_engine]) in [electric_engine, hydrogen_engine]
+    assert len({agent_pref.most_preferred([electric_engine, hydrogen_engine], random.Random(seed))
+                for seed in range(20)}) == 2
+    assert len({agent_pref.most_preferred([electric_engine, hydrogen_engine], random.Random(0))
+                for _ in range(20)}) == 1
+    assert agent_pref.is_item_among_top_10_percent(diesel_engine, all_engines)
+    agent_pref.add_criterion_value(CriterionValue(hydrogen_engine, CriterionName.PRODUCTION_COST, Value.VERY_GOOD))
+    agent_pref.add_criterion_value(CriterionValue(hydrogen_engine, CriterionName.CONSUMPTION, Value.VERY_GOOD))
+    assert agent_pref.most_preferred(all_engines) == hydrogen_engine
+    print("[INFO] Memoized scores are invalidated when values change... OK!")
+
+    """test lists of items which are not the items of the preferences"""
+    assert agent_pref.covers_all_items([hydrogen_engine, diesel_engine, electric_engine])
+    assert not agent_pref.covers_all_items([hydrogen_engine, hydrogen_engine, electric_engine])
+    assert agent_pref.most_preferred([electric_engine, electric_engine, diesel_engine]) == diesel_engine
+    assert not agent_pref.is_item_among_top_10_percent(electric_engine, [electric_engine, electric_engine,
+                                                                         hydrogen_engine])
+    try:
+        agent_pref.get_score(Item("Unknown Engine", ""))
+        unknown_item_found = True
+    except LookupError:
+        unknown_item_found = False
+    assert not unknown_item_found
+
+    shared_engines = [diesel_engine, electric_engine]
+    shared_pref = Preferences.from_value_matrix(shared_engines, CRITERIA, np.zeros((2, len(CRITERIA)), dtype=np.int8))
+    assert shared_pref.covers_all_items(shared_engines)
+    shared_engines.append(hydrogen_engine)
+    assert not shared_pref.covers_all_items(shared_engines)
+    print("[INFO] Lists of items with duplicates or unknown items... OK!")
+
+    """test the criterion ranks"""
+    assert agent_pref.get_criterion_rank(CriterionName.PRODUCTION_COST) == 0
+    assert agent_pref.is_preferred_criterion(CriterionName.ENVIRONMENT_IMPACT, CriterionName.NOISE)
+    assert not agent_pref.is_preferred_criterion(CriterionName.NOISE, CriterionName.CONSUMPTION)
+    assert agent_pref.get_criteria_preferred_to(CriterionName.CONSUMPTION) == [CriterionName.PRODUCTION_COST,
+                                                                                CriterionName.ENVIRONMENT_IMPACT]
+    print("[INFO] Criterion ranks... OK!")
+
+    """test the premiss tables"""
+    assert agent_pref.get_supporting_premisses(diesel_engine) == ((CriterionName.PRODUCTION_COST, Value.VERY_GOOD),
+                                                                  (CriterionName.CONSUMPTION, Value.GOOD),
+                                                                  (CriterionName.DURABILITY, Value.VERY_GOOD))
+    assert agent_pref.get_supporting_premisses(diesel_engine) is agent_pref.get_supporting_premisses(diesel_engine)
+    assert agent_pref.get_attacking_premisses(diesel_engine) == ((CriterionName.ENVIRONMENT_IMPACT, Value.VERY_BAD),
+                                                                 (CriterionName.NOISE, Value.VERY_BAD))
+    assert agent_pref.get_attacking_premisses(electric_engine) == ((CriterionName.PRODUCTION_COST, Value.BAD),
+                                                                   (CriterionName.CONSUMPTION, Value.VERY_BAD))
+    agent_pref.add_criterion_value(CriterionValue(electric_engine, CriterionName.CONSUMPTION, Value.AVERAGE))
+    assert agent_pref.get_attacking_premisses(electric_engine) == ((CriterionName.PRODUCTION_COST, Value.BAD),)
+    assert agent_pref.get_supporting_premisses(Item("Unknown Engine", "")) == ()
+    print("[INFO] Memoized premisses are invalidated when values change... OK!")
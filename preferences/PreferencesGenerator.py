@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+from typing import List, Tuple, Union
+from preferences.CriterionValue import CriterionValue
+from preferences.Item import Item
+from preferences.Preferences import Preferences, CRITERIA
+from preferences.PopulationPreferences import PopulationPreferences
+from preferences.Value import Value
+
+import numpy as np
+
+
+class PreferencesGenerator:
+    """PreferencesGenerator class.
+    This class draws random preferences for a population of agents from a seeded NumPy generator.
+
+    attr:
+        item_list: the list of items the preferences are about
+        seed_sequence: the seed sequence every random stream is derived from
+    """
+
+    def __init__(self, item_list: List[Item], seed: Union[int, None] = None):
+        """Creates a new PreferencesGenerator. Two generators created with the same seed draw the same preferences.
+        """
+        self.__item_list = item_list
+        self.__seed_sequence = np.random.SeedSequence(seed)
+
+    def _get_agent_generator(self, agent_index: int) -> np.random.Generator:
+        """Returns the random stream of an agent, which only depends on the seed and on the index of the agent.
+        """
+        return np.random.default_rng(np.random.SeedSequence(self.__seed_sequence.entropy, spawn_key=(agent_index,)))
+
+    def generate_arrays(self, number_of_agents: int, per_agent_streams: bool = False) \
+            -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Draws the values and the criterion orders of a population.
+
+        :param number_of_agents: int - the number of agents to draw preferences for
+        :param per_agent_streams: bool - whether each agent is drawn from its own random stream, so that the
+        preferences of an agent do not depend on the size of the population nor on the order of generation
+        :return: the agents x items x criteria array of values and, for each agent, the criterion columns ordered by
+        importance
+        """
+        shape = (len(self.__item_list), len(CRITERIA))
+
+        if not per_agent_streams:
+            generator = np.random.default_rng(self.__seed_sequence)
+            value_tensor = generator.integers(0, len(Value), size=(number_of_agents, *shape), dtype=np.int8)
+            criterion_orders = np.argsort(generator.random((number_of_agents, len(CRITERIA))), axis=1)
+            return value_tensor, criterion_orders
+
+        value_tensor = np.empty((number_of_agents, *shape), dtype=np.int8)
+        criterion_orders = np.empty((number_of_agents, len(CRITERIA)), dtype=np.intp)
+        for agent_index in range(number_of_agents):
+            value_tensor[agent_index], criterion_orders[agent_index] = self.generate_agent_arrays(agent_index)
+
+        return value_tensor, criterion_orders
+
+    def generate_agent_arrays(self, agent_index: int) -> Tuple[np.ndarray, np.ndarray]:
+        """Draws the values and the criterion order of a single agent from its own random stream.
+        """
+        generator = self._get_agent_generator(agent_index)
+        values = generator.integers(0, len(Value), size=(len(self.__item_list), len(CRITERIA)), dtype=np.int8)
+        criterion_order = np.argsort(generator.random(len(CRITERIA)))
+        return values, criterion_order
+
+    def generate(self, number_of_agents: int, per_agent_streams: bool = False) -> List[Preferences]:
+        """Draws the preferences of a population of agents.
+        """
+        return self.generate_population(number_of_agents, per_agent_streams)[0]
+
+    def generate_population(self, number_of_agents: int, per_agent_streams: bool = False) \
+            -> Tuple[List[Preferences], PopulationPreferences]:
+        """Draws the preferences of a population of agents, along with their scores computed in batch.
+        """
+        value_tensor, criterion_orders = self.generate_arrays(number_of_agents, per_agent_streams)
+
+        # Every agent shares the same item index, the weights halve at each rank of the criterion order
+        item_index = Preferences.build_item_index(self.__item_list)
+        weight_matrix = np.zeros((number_of_agents, len(CRITERIA)))
+        weight_matrix[np.arange(number_of_agents)[:, None], criterion_orders] = 100 / 2 ** np.arange(len(CRITERIA))
+
+        preferences_list = [
+            Preferences.from_value_matrix(
+                self.__item_list,
+                [CRITERIA[column] for column in criterion_order],
+                values,
+                item_index
+            )
+            for values, criterion_order in zip(value_tensor, criterion_orders.tolist())
+        ]
+
+        population_preferences = PopulationPreferences(self.__item_list, value_tensor, weight_matrix)
+        population_preferences.prime(preferences_list)
+
+        return preferences_list, population_preferences
+
+    def generate_agent(self, agent_index: int) -> Preferences:
+        """Draws the preferences of a single agent from its own random stream, as generate(..., True) would.
+        """
+        values, criterion_order = self.generate_agent_arrays(agent_index)
+        return Preferences.from_value_matrix(
+            self.__item_list,
+            [CRITERIA[column] for column in criterion_order.tolist()],
+            values
+        )
+
+
+if __name__ == '__main__':
+    engines = [Item("Engine " + str(index), "A generated engine") for index in range(20)]
+
+    preferences_list = PreferencesGenerator(engines, seed=42).generate(10)
+    same_preferences_list = PreferencesGenerator(engines, seed=42).generate(10)
+
+    assert len(preferences_list) == 10
+    assert preferences_list[0].get_value_matrix().shape == (20, len(CRITERIA))
+    assert sorted(preferences_list[0].get_criterion_name_list(), key=lambda c: c.value) == CRITERIA
+    for preferences, same_preferences in zip(preferences_list, same_preferences_list):
+        assert (preferences.get_value_matrix() == same_preferences.get_value_matrix()).all()
+        assert preferences.get_criterion_name_list() == same_preferences.get_criterion_name_list()
+    print("[INFO] Generation is reproducible with a seed... OK!")
+
+    generator = PreferencesGenerator(engines, seed=7)
+    preferences_list, population = generator.generate_population(5, per_agent_streams=True)
+    third_agent = generator.generate_agent(3)
+    assert (third_agent.get_value_matrix() == preferences_list[3].get_value_matrix()).all()
+    assert third_agent.get_criterion_name_list() == preferences_list[3].get_criterion_name_list()
+    print("[INFO] Per agent streams do not depend on the population... OK!")
+
+    assert np.allclose(population.get_score_matrix()[3], [third_agent.get_score(engine) for engine in engines])
+    for agent_index, preferences in enumerate(preferences_list):
+        assert population.get_most_preferred_items()[agent_index] == preferences.get_ranking()[0]
+    print("[INFO] Batch scores are consistent with the preferences... OK!")
+
+    # Modifying the preferences of an agent does not modify the values of the population
+    value_tensor = population.get_value_tensor().copy()
+    preferences_list[0].add_criterion_value(CriterionValue(engines[0], CRITERIA[0], Value.VERY_BAD))
+    preferences_list[0].add_criterion_value(CriterionValue(engines[1], CRITERIA[0], Value.VERY_GOOD))
+    assert (population.get_value_tensor() == value_tensor).all()
+    assert preferences_list[0].get_value(engines[1], CRITERIA[0]) == Value.VERY_GOOD
+    print("[INFO] The values of the population are copied on write... OK!")
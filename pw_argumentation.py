@@ -2,18 +2,25 @@ from mesa import Model
 from mesa.time import RandomActivation
 from typing import List, Tuple, Union
 
+import random
+
 from agent.CommunicatingAgent import CommunicatingAgent
+from agent.EventDrivenActivation import EventDrivenActivation
+from mailbox.RetentionPolicy import DropEndedNegotiationRetention
 from message.MessageService import MessageService
 from message.Message import Message
 from message.MessagePerformative import MessagePerformative
+from message.TraceSink import PrintTraceSink
 
 from preferences.Preferences import Preferences
+from preferences.PopulationPreferences import PopulationPreferences
+from preferences.PreferencesGenerator import PreferencesGenerator
 from preferences.CriterionName import CriterionName
-from preferences.CriterionValue import CriterionValue
 from preferences.Item import Item
-from preferences.Value import Value
+from preferences.ItemCatalog import ItemCatalog
 
 from arguments.Argument import Argument
+from arguments.ArgumentCodec import ArgumentCodec
 from arguments.CoupleValue import CoupleValue
 from arguments.Comparison import Comparison
 
@@ -21,8 +28,7 @@ from negociation.Negotiation import Negotiation
 
 from role.Role import Role
 from role.DirectoryFaciliator import DirectoryFacilitator
-
-import random
+from role.Topology import RandomRegularTopology, Topology
 
 
 class ArgumentAgent(CommunicatingAgent):
@@ -30,38 +36,67 @@ class ArgumentAgent(CommunicatingAgent):
     ArgumentAgent which inherit from CommunicatingAgent.
     """
 
-    def __init__(self, unique_id, model: 'ArgumentModel', name, engine_models: List[Item]):
-        super().__init__(unique_id, model, name)
+    def __init__(self, unique_id, model: 'ArgumentModel', name, engine_models: List[Item],
+                 preference: Preferences = None, retention_policy=None):
+        super().__init__(unique_id, model, name, retention_policy)
         self._engines = engine_models
-        self.preference = ArgumentAgent._generate_preferences(engine_models, CriterionName.to_list())
+        self.preference = preference if preference is not None else ArgumentAgent._generate_preferences(engine_models)
         self.announce_existence_to_the_world = False
         self._df = model.get_directory_facilitator()
         self._negotiations = model.get_negotiations()
+        # Set once the agent has gone through all its interlocutors, which it only does at the end of a step
+        self._negotiations_to_start = True
+        self._memoize_preference()
 
     def get_preference(self):
         return self.preference
 
-    @staticmethod
-    def _generate_preferences(engine_models: List[Item], criteria: List[CriterionName]) -> Preferences:
-        # Creating the preference instance
-        preference = Preferences()
-
-        # Shuffling criteria preferences
-        random.shuffle(criteria)
-
-        # Setting the order of preferences for this agent
-        preference.set_criterion_name_list(criteria)
-
-        # Attributing a value for each characteristic of each engine model
-        for engine_model in engine_models:
-            for criterion in criteria:
-                preference.add_criterion_value(CriterionValue(
-                    engine_model,
-                    criterion,
-                    random.choice(Value.to_list())
-                ))
+    def _memoize_preference(self):
+        """
+        Computes once the state derived from the preferences of the agent: its preferred engine (ties being broken once
+        and for all with the random generator of the model) and the rank of each engine. Must be called again if the
+        preferences of the agent change.
+        """
+        self._most_preferred_engine = self.preference.most_preferred(self._engines, self.model.random)
+        if self.preference.covers_all_items(self._engines):
+            engine_ranking = self.preference.get_ranking()
+        else:
+            engine_ranking = sorted(self._engines, key=self.preference.get_score, reverse=True)
+        self._engine_ranks = {engine: rank for rank, engine in enumerate(engine_ranking)}
+
+    def get_most_preferred_engine(self) -> Item:
+        return self._most_preferred_engine
+
+    def is_engine_among_top_percent(self, engine: Item, percent: float) -> bool:
+        """
+        Checks whether an engine is among the top percent of the engines of the agent, as
+        Preferences.is_item_among_top_percent would, from the memoized ranks.
+        :param engine: Item - one of the engines of the agent
+        :param percent: float - the percentage of the engines
+        :return: True if the engine is among the favourite ones
+        """
+        return self._engine_ranks[engine] <= int(percent / 100 * len(self._engines))
+
+    def get_supporting_premisses(self, engine: Item) -> Tuple[Tuple, ...]:
+        """
+        Returns the premisses supporting an engine, sorted by importance, as memoized by the preferences of the agent.
+        :param engine: Item - the engine to support
+        :return: the tuple of (criterion name, value) supporting the engine
+        """
+        return Argument.list_supporting_proposal(engine, self.preference)
 
-        return preference
+    def get_attacking_premisses(self, engine: Item) -> Tuple[Tuple, ...]:
+        """
+        Returns the premisses attacking an engine, sorted by importance, as memoized by the preferences of the agent.
+        :param engine: Item - the engine to attack
+        :return: the tuple of (criterion name, value) attacking the engine
+        """
+        return Argument.list_attacking_proposal(engine, self.preference)
+
+    @staticmethod
+    def _generate_preferences(engine_models: List[Item], seed: int = None) -> Preferences:
+        # Drawing a criterion order and a value for each characteristic of each engine model
+        return PreferencesGenerator(engine_models, seed).generate(1)[0]
 
     def try_get_counter_argument(self, argument: 'Argument', interlocutor_id: str) \
             -> Union['Argument', Message, None]:
@@ -87,21 +122,24 @@ class ArgumentAgent(CommunicatingAgent):
 
             :return: Possibly a counter argument to the one proposed by the agent with the identifier: interlocutor_id.
             """
-            bad_criteria = Argument.list_attacking_proposal(engine, self.preference)
+            bad_criteria = self.get_attacking_premisses(engine)
             base_criterion = premiss.get_criterion_name()
+            base_rank = self.preference.get_criterion_rank(base_criterion)
 
             # We iterate through our possible counter arguments to find if we could use one of them
             for criterion_name, criterion_val in bad_criteria:
+                # The premisses are sorted by importance, the next ones are not ranked above the base criterion
+                if self.preference.get_criterion_rank(criterion_name) >= base_rank:
+                    break
 
-                if self.preference.is_preferred_criterion(criterion_name, base_criterion) and base_criterion != criterion_name:
-                    argument = Argument(False, engine)
-                    # One has to remember that list_attacking_proposal and list_proposal both return a tuple of
-                    # the form (preference, value)
-                    argument.add_premiss_couple_values(criterion_name, criterion_val)
-                    argument.add_premiss_comparison(criterion_name, premiss.get_criterion_name())
+                argument = Argument(False, engine)
+                # One has to remember that list_attacking_proposal and list_proposal both return a tuple of
+                # the form (preference, value)
+                argument.add_premiss_couple_values(criterion_name, criterion_val)
+                argument.add_premiss_comparison(criterion_name, premiss.get_criterion_name())
 
-                    if not self._negotiations.is_argument_already_used(self.get_name(), interlocutor_id, argument):
-                        return argument
+                if not self._negotiations.is_argument_already_used(self.get_name(), interlocutor_id, argument):
+                    return argument
             return None
 
         def criterion_value(premiss: CoupleValue, interlocutor_id: str, better_value: bool, engine: Item = None) -> \
@@ -119,7 +157,7 @@ class ArgumentAgent(CommunicatingAgent):
             :return: Possibly a counter argument to the one proposed by the agent with the identifier: interlocutor_id.
             """
             argument = None
-            preferred_engine = self.preference.most_preferred(self._engines)
+            preferred_engine = self._most_preferred_engine
             value_for_criterion = self.preference.get_criterion_value_for_item(
                 preferred_engine if better_value else engine
             )[premiss.get_criterion_name()]
@@ -142,7 +180,7 @@ class ArgumentAgent(CommunicatingAgent):
             return argument
 
         conclusion, premisses = Argument.argument_parsing(argument)
-        most_preferred_engine = self.preference.most_preferred(self._engines)
+        most_preferred_engine = self._most_preferred_engine
 
         # Getting engine mentioned in the argument
         engine = conclusion[1]
@@ -187,25 +225,29 @@ class ArgumentAgent(CommunicatingAgent):
             comparison: Comparison = premisses[1]
 
             # Getting proposals that we could use to defend our engine
-            proposals = Argument.list_supporting_proposal(engine, self.preference)
+            proposals = self.get_supporting_premisses(engine)
 
             # Then we need to check if the comparison is based on criterion
             if type(comparison.get_best_criterion_name()) == CriterionName:
                 # Now we will iterate through the proposals to find one that we could be used to counter the argument
                 # used the other agent
                 base_criterion = comparison.get_best_criterion_name()
+                base_rank = self.preference.get_criterion_rank(base_criterion)
 
                 # We iterate through our possible counter arguments to find if we could use one of them
                 for criterion_name, criterion_val in proposals:
-                    # We check if the criterion that the criterion mentioned by the other agent
-                    if self.preference.is_preferred_criterion(criterion_name, base_criterion) and criterion_name != base_criterion:
-                        argument = Argument(True, engine)
-                        # One has to remember that list_attacking_proposal and list_proposal both return a tuple of
-                        # the form (preference, value)
-                        argument.add_premiss_couple_values(criterion_name, criterion_val)
-                        argument.add_premiss_comparison(criterion_name, base_criterion)
+                    # We check if the criterion is ranked above the criterion mentioned by the other agent, the
+                    # proposals being sorted by importance the next ones would not be
+                    if self.preference.get_criterion_rank(criterion_name) >= base_rank:
+                        break
 
-                        return argument
+                    argument = Argument(True, engine)
+                    # One has to remember that list_attacking_proposal and list_proposal both return a tuple of
+                    # the form (preference, value)
+                    argument.add_premiss_couple_values(criterion_name, criterion_val)
+                    argument.add_premiss_comparison(criterion_name, base_criterion)
+
+                    return argument
 
             # Otherwise we will try to find a criterion that has not been used yet
             for criterion_name, criterion_val in proposals:
@@ -218,6 +260,13 @@ class ArgumentAgent(CommunicatingAgent):
 
         return None
 
+    def has_pending_work(self):
+        """
+        Checks whether the agent has unread messages or interlocutors it has not started a negotiation with yet.
+        :return: True if the agent has to be activated again
+        """
+        return self._negotiations_to_start or super().has_pending_work()
+
     def step(self):
         # Get a list of interlocutors with which the agent can talk about engines
         engines_interlocutors = self._df.get_agents_with_specific_role(self.get_name(), Role.EnginesTalker)
@@ -241,11 +290,11 @@ class ArgumentAgent(CommunicatingAgent):
                 engine = message.get_content()
 
                 # We check if the engine proposed is one of our preferred ones
-                if self.preference.is_item_among_top_10_percent(engine, self._engines):
+                if self.is_engine_among_top_percent(engine, 10):
                     # We then need to check if the engine is our preferred one
-                    most_preferred_engine = self.preference.most_preferred(self._engines)
+                    most_preferred_engine = self._most_preferred_engine
 
-                    if most_preferred_engine.get_name() == engine.get_name():
+                    if most_preferred_engine == engine:
                         self.send_message(Message(
                             self.get_name(),
                             expeditor,
@@ -286,7 +335,7 @@ class ArgumentAgent(CommunicatingAgent):
 
                 # We send a message with commit performative
                 argument = Argument(True, engine)
-                argument.add_premiss_couple_values(*Argument.support_proposal(engine, self.preference))
+                argument.add_premiss_couple_values(*self.get_supporting_premisses(engine)[0])
 
                 # Keeping argument in memory
                 self._negotiations.add_argument(self.get_name(), expeditor, argument)
@@ -387,7 +436,7 @@ class ArgumentAgent(CommunicatingAgent):
                     self.get_name(),
                     expeditor,
                     MessagePerformative.INFORM_REF,
-                    self.preference.most_preferred(self._engines)
+                    self._most_preferred_engine
                 ))
             elif performative == MessagePerformative.INFORM_REF:
                 engine = message.get_content()
@@ -410,7 +459,7 @@ class ArgumentAgent(CommunicatingAgent):
                 self._negotiations.start_negotiation(self.get_name(), interlocutor_id)
 
                 # We retrieve our most preferred engine
-                most_preferred_engine = self.preference.most_preferred(self._engines)
+                most_preferred_engine = self._most_preferred_engine
 
                 # We have to register our preferred engine
                 self._negotiations.add_engine(self.get_name(), interlocutor_id, most_preferred_engine)
@@ -423,25 +472,56 @@ class ArgumentAgent(CommunicatingAgent):
                     most_preferred_engine
                 ))
 
+        # Every interlocutor has now either sent a message or been proposed an engine
+        self._negotiations_to_start = False
+
 
 class ArgumentModel(Model):
     """
     ArgumentModel which inherit from Model.
     """
 
-    def __init__(self, agents_name: List[str]):
+    def __init__(self, agents_name: List[str], engine_models: List[Item], seed: int = None,
+                 per_agent_streams: bool = False, trace_sink=None, retention_policy_factory=None,
+                 event_driven: bool = False, topology: Topology = None):
+        """
+        Creates the model. The seed is used to draw the preferences of the agents and to seed the random generator of
+        the model, which breaks the ties between preferred engines and orders the activation of the agents. The
+        messages are only traced if a trace_sink is given. If a retention_policy_factory is given, it is called with
+        the name of each agent and the model to create the retention policy of its mailbox. If event_driven is True, only the agents
+        with pending work (unread messages or negotiations to start) are activated at each step. If a topology is
+        given, each agent only negotiates with its neighbours in it instead of with every other agent.
+        """
         super().__init__()
-        self.schedule = RandomActivation(self)
-        self.__messages_service = MessageService(self.schedule)
+        # Mesa shares its generator between the instances of the class, and only seeds it from a keyword argument
+        self.random = random.Random(seed)
+        self.schedule = EventDrivenActivation(self) if event_driven else RandomActivation(self)
+        self.__messages_service = MessageService(self.schedule, trace_sink=trace_sink)
         self._df = DirectoryFacilitator()
         self._df.add_role(Role.EnginesTalker)
+        self._df.set_topology(Role.EnginesTalker, topology)
         self.running = True
-        self._negotiations = Negotiation(agents_name)
 
         agents_identifier = []
 
+        # Interning the engines so that every agent and message refers to the same objects. The agents and their
+        # preferences get a copy of the list, which must not grow when items are interned later, e.g. by a codec
+        self._item_catalog = ItemCatalog(engine_models)
+        engine_models = list(self._item_catalog.get_items())
+
+        # The arguments used in the negotiations are stored as integers, identifying engines through the catalog
+        self._negotiations = Negotiation(agents_name, ArgumentCodec(self._item_catalog))
+
+        # Drawing the preferences of every agent in one batch, along with the scores of every engine for every agent
+        preferences_generator = PreferencesGenerator(engine_models, seed)
+        preferences_list, self._population_preferences = preferences_generator.generate_population(
+            len(agents_name), per_agent_streams
+        )
+
         for index, agent_name in enumerate(agents_name):
-            agent = ArgumentAgent(index, self, agent_name, engines)
+            retention_policy = retention_policy_factory(agent_name, self) if retention_policy_factory is not None \
+                else None
+            agent = ArgumentAgent(index, self, agent_name, engine_models, preferences_list[index], retention_policy)
             agents_identifier.append(index)
             self.schedule.add(agent)
             self._df.attach_a_role_to_agent(Role.EnginesTalker, agent.get_name())
@@ -449,9 +529,24 @@ class ArgumentModel(Model):
     def get_directory_facilitator(self):
         return self._df
 
+    def get_message_service(self) -> MessageService:
+        return self.__messages_service
+
+    def get_population_preferences(self) -> PopulationPreferences:
+        return self._population_preferences
+
+    def get_item_catalog(self) -> ItemCatalog:
+        return self._item_catalog
+
     def get_negotiations(self):
         return self._negotiations
 
+    def close(self):
+        """
+        Closes the message service, so that the messages buffered by the trace sink are written.
+        """
+        self.__messages_service.close()
+
     def step(self):
         self.__messages_service.dispatch_messages()
         self.schedule.step()
@@ -461,6 +556,31 @@ class ArgumentModel(Model):
             self.__messages_service.dispatch_messages()
             self.schedule.step()
 
+    def _is_idle(self) -> bool:
+        """
+        Checks whether the event driven scheduler has no agent to activate and no message is waiting to be dispatched.
+        :return: True if the next steps would not activate any agent
+        """
+        return isinstance(self.schedule, EventDrivenActivation) and self.schedule.get_awake_agent_count() == 0 \
+            and not self.__messages_service.has_pending_messages()
+
+    def run_until_converged(self, max_steps: int) -> int:
+        """
+        Runs the model until every negotiation that has started has ended, or for at most max_steps steps. With the
+        event driven scheduler, the run also stops once no agent has pending work and no message is waiting, as
+        nothing can happen anymore.
+        :param max_steps: int - the maximum number of steps to run
+        :return: the number of steps actually run
+        """
+        for step in range(1, max_steps + 1):
+            self.step()
+
+            if self._negotiations.get_open_negotiations_count() == 0 or self._is_idle():
+                self.running = False
+                return step
+
+        return max_steps
+
 
 if __name__ == "__main__":
     # Creating a list that will contain the different engines used
@@ -484,7 +604,81 @@ if __name__ == "__main__":
     ]
 
     # Creating our model
-    argument_model = ArgumentModel(agents_name)
+    argument_model = ArgumentModel(agents_name, engines, trace_sink=PrintTraceSink())
 
     # Running
-    argument_model.run_n_step(100)
+    steps = argument_model.run_until_converged(100)
+    argument_model.close()
+    print("[INFO] Negotiations ended after {} steps".format(steps))
+
+    # Items interned after the creation of the model are not added to the engines of the agents
+    argument_model.get_item_catalog().intern(Item("Steam Engine", "An engine from the industrial revolution"))
+    for agent in argument_model.schedule.agents:
+        assert len(agent._engines) == len(engines)
+        assert agent.get_preference().covers_all_items(agent._engines)
+    print("[INFO] The engines of the agents do not follow the item catalog... OK!")
+
+    # Ties between preferred engines only depend on the seed of the model, not on the random module
+    many_agents_name = ["Agent " + str(index) for index in range(300)]
+    first_model = ArgumentModel(many_agents_name, engines, seed=3)
+    random.random()
+    second_model = ArgumentModel(many_agents_name, engines, seed=3)
+    assert [agent.get_most_preferred_engine() for agent in first_model.schedule.agents] == \
+        [agent.get_most_preferred_engine() for agent in second_model.schedule.agents]
+    print("[INFO] Preferred engines are reproducible with a seed... OK!")
+
+    for agent in first_model.schedule.agents[:20]:
+        for engine in engines:
+            assert agent.is_engine_among_top_percent(engine, 10) == \
+                agent.get_preference().is_item_among_top_10_percent(engine, agent._engines)
+    print("[INFO] Memoized ranks of the engines... OK!")
+
+    # The mailboxes drop the messages of the negotiations that have ended
+    def drop_ended_negotiations(agent_name, model):
+        negotiations = model.get_negotiations()
+        return DropEndedNegotiationRetention(lambda exp: negotiations.is_negotiation_ended(agent_name, exp))
+
+    retention_model = ArgumentModel(many_agents_name[:10], engines, seed=1,
+                                    retention_policy_factory=drop_ended_negotiations)
+    retention_model.run_until_converged(100)
+    assert retention_model.get_negotiations().get_ended_negotiations_count() > 0
+    for agent in retention_model.schedule.agents:
+        # Reading the mailbox once more lets the policy see the negotiations ended after the last read
+        agent.get_new_messages()
+        assert all(not retention_model.get_negotiations().is_negotiation_ended(agent.get_name(), message.get_exp())
+                   for message in agent.get_messages())
+    print("[INFO] Messages of ended negotiations are dropped during a run... OK!")
+
+    # The run stops at the first step after which no negotiation is open, or once the step budget is spent
+    reference_model = ArgumentModel(agents_name, engines, seed=5)
+    expected_steps = 0
+    for expected_steps in range(1, 101):
+        reference_model.step()
+        if reference_model.get_negotiations().get_open_negotiations_count() == 0:
+            break
+    assert 1 < expected_steps < 100
+
+    converged_model = ArgumentModel(agents_name, engines, seed=5)
+    assert converged_model.run_until_converged(100) == expected_steps
+    assert converged_model.get_negotiations().get_open_negotiations_count() == 0
+    assert not converged_model.running
+
+    budget_model = ArgumentModel(agents_name, engines, seed=5)
+    assert budget_model.run_until_converged(expected_steps - 1) == expected_steps - 1
+    assert budget_model.get_negotiations().get_open_negotiations_count() > 0
+    assert budget_model.running
+    print("[INFO] Running until the negotiations have ended or for a step budget... OK!")
+
+    # With a topology, the agents only negotiate with their neighbours, each agent having a single one here
+    topology_model = ArgumentModel(many_agents_name[:8], engines, seed=0, topology=RandomRegularTopology(1, seed=0))
+    assert topology_model.run_until_converged(100) < 100
+    assert topology_model.get_negotiations().get_ended_negotiations_count() == 4
+    for agent in topology_model.schedule.agents:
+        neighbours = topology_model.get_directory_facilitator().get_agents_with_specific_role(agent.get_name(),
+                                                                                             Role.EnginesTalker)
+        assert len(neighbours) == 1
+        for other_agent_name in many_agents_name[:8]:
+            if other_agent_name != agent.get_name():
+                assert topology_model.get_negotiations().has_started_negotiation(agent.get_name(), other_agent_name) \
+                    == (other_agent_name in neighbours)
+    print("[INFO] Negotiating with the neighbours in a topology... OK!")
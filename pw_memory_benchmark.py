@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Measuring the memory used by the value objects created in the engine model (messages, arguments and their premisses,
+criterion values) and the cost of reading their attributes.
+
+Example:
+    python pw_memory_benchmark.py --objects 100000
+"""
+from typing import Callable, Dict, List
+
+import argparse
+import gc
+import time
+import tracemalloc
+
+from arguments.Argument import Argument
+from arguments.Comparison import Comparison
+from arguments.CoupleValue import CoupleValue
+
+from message.Message import Message
+from message.MessagePerformative import MessagePerformative
+
+from preferences.CriterionName import CriterionName
+from preferences.CriterionValue import CriterionValue
+from preferences.Item import Item
+from preferences.Value import Value
+
+ENGINE = Item("Engine", "A benchmarked engine")
+
+
+def create_argument(index: int) -> Argument:
+    """
+    Creates an argument with one couple value and one comparison, as built by the agents.
+    :param index: int - the index of the argument, used to vary its premisses
+    :return: the argument
+    """
+    argument = Argument(index % 2 == 0, ENGINE)
+    argument.add_premiss_couple_values(CriterionName.NOISE, Value.VERY_GOOD)
+    argument.add_premiss_comparison(CriterionName.NOISE, CriterionName.CONSUMPTION)
+    return argument
+
+
+FACTORIES: Dict[str, Callable[[int], object]] = {
+    "Message": lambda index: Message("Agent 0", "Agent 1", MessagePerformative.PROPOSE, ENGINE),
+    "Argument": create_argument,
+    "CoupleValue": lambda index: CoupleValue(CriterionName.NOISE, Value.VERY_GOOD),
+    "Comparison": lambda index: Comparison(CriterionName.NOISE, CriterionName.CONSUMPTION),
+    "CriterionValue": lambda index: CriterionValue(ENGINE, CriterionName.NOISE, Value.VERY_GOOD),
+}
+
+READERS: Dict[str, Callable[[object], object]] = {
+    "Message": lambda message: (message.get_exp(), message.get_dest(), message.get_performative(),
+                                message.get_content()),
+    "Argument": lambda argument: Argument.argument_parsing(argument),
+    "CoupleValue": lambda couple_value: (couple_value.get_criterion_name(), couple_value.get_value()),
+    "Comparison": lambda comparison: (comparison.get_best_criterion_name(), comparison.get_worst_criterion_name()),
+    "CriterionValue": lambda criterion_value: (criterion_value.get_item(), criterion_value.get_criterion_name(),
+                                               criterion_value.get_value()),
+}
+
+
+def measure(name: str, number_of_objects: int) -> Dict:
+    """
+    Creates objects of one kind while tracing the allocations, then reads all their attributes.
+    :param name: str - the name of the class, a key of FACTORIES
+    :param number_of_objects: int - the number of objects to create
+    :return: a dictionary holding the bytes allocated per object (including its slot in the list holding the objects)
+    and the time spent per creation and per read
+    """
+    factory = FACTORIES[name]
+    reader = READERS[name]
+    gc.collect()
+
+    # The creation is timed without tracing the allocations, which would slow it down
+    start = time.perf_counter()
+    objects: List = [factory(index) for index in range(number_of_objects)]
+    creation_time = time.perf_counter() - start
+    del objects
+    gc.collect()
+
+    tracemalloc.start()
+    objects = [factory(index) for index in range(number_of_objects)]
+    allocated_bytes, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    start = time.perf_counter()
+    for obj in objects:
+        reader(obj)
+    read_time = time.perf_counter() - start
+
+    return {
+        "class": name,
+        "bytes_per_object": allocated_bytes / number_of_objects,
+        "creation_ns": 1e9 * creation_time / number_of_objects,
+        "read_ns": 1e9 * read_time / number_of_objects
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Measures the memory used by the value objects of the model.")
+    parser.add_argument("--objects", type=int, default=100000, help="number of objects created per class")
+    arguments = parser.parse_args()
+
+    print("{:<16}{:>18}{:>16}{:>12}".format("class", "bytes per object", "creation (ns)", "read (ns)"))
+    for class_name in FACTORIES:
+        result = measure(class_name, arguments.objects)
+        print("{:<16}{:>18.1f}{:>16.1f}{:>12.1f}".format(result["class"], result["bytes_per_object"],
+                                                        result["creation_ns"], result["read_ns"]))
@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+Running ArgumentModel over a grid of parameters (numbers of agents and engines, seeds and step budgets) on all
+cores, and streaming the result of each run into a CSV or a .npz file.
+
+Example:
+    python pw_sweep.py --agents 2 10 50 --engines 10 100 --seeds 0 1 2 --steps 100 --output sweep.csv
+"""
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from contextlib import nullcontext
+from typing import Dict, Iterable, List
+
+import argparse
+import csv
+import itertools
+import time
+
+import numpy as np
+
+from preferences.Item import Item
+
+from pw_argumentation import ArgumentModel
+
+RESULT_FIELDS = ["agents", "engines", "seed", "step_budget", "agreements", "steps", "messages", "wall_time"]
+
+
+def generate_engines(number_of_engines: int) -> List[Item]:
+    """
+    Creates a list of synthetic engines.
+    :param number_of_engines: int - the number of engines to create
+    :return: the list of engines
+    """
+    return [Item("Engine " + str(index), "A generated engine") for index in range(number_of_engines)]
+
+
+def generate_agents_name(number_of_agents: int) -> List[str]:
+    """
+    Creates the names of the agents of a run.
+    :param number_of_agents: int - the number of agents
+    :return: the list of names
+    """
+    return ["Agent " + str(index) for index in range(number_of_agents)]
+
+
+def run_single(number_of_agents: int, number_of_engines: int, seed: int, step_budget: int) -> Dict:
+    """
+    Runs one ArgumentModel and measures it.
+    :param number_of_agents: int - the number of agents of the model
+    :param number_of_engines: int - the number of engines the agents negotiate about
+    :param seed: int - the seed of the preferences and of the activation of the agents
+    :param step_budget: int - the maximum number of steps to run, the run stops once every negotiation has ended
+    :return: a dictionary holding the parameters and the results of the run (see RESULT_FIELDS)
+    """
+    start = time.perf_counter()
+    model = ArgumentModel(generate_agents_name(number_of_agents), generate_engines(number_of_engines), seed=seed)
+    steps = model.run_until_converged(step_budget)
+    wall_time = time.perf_counter() - start
+
+    return {
+        "agents": number_of_agents,
+        "engines": number_of_engines,
+        "seed": seed,
+        "step_budget": step_budget,
+        "agreements": model.get_negotiations().get_ended_negotiations_count(),
+        "steps": steps,
+        "messages": model.get_message_service().get_sent_messages_count(),
+        "wall_time": wall_time
+    }
+
+
+def run_sweep(agent_counts: Iterable[int], engine_counts: Iterable[int], seeds: Iterable[int],
+              step_budgets: Iterable[int], output_path: str, max_workers: int = None) -> List[Dict]:
+    """
+    Runs every combination of parameters in a pool of processes. Results are written to a CSV file as soon as each
+    run completes, or gathered in a .npz file (one array per field) once the sweep is over.
+    :param agent_counts: the numbers of agents to try
+    :param engine_counts: the numbers of engines to try
+    :param seeds: the seeds to try
+    :param step_budgets: the numbers of steps to try
+    :param output_path: str - the path of the output file, ending with .csv or .npz
+    :param max_workers: int - the number of processes (the number of cores by default)
+    :return: the results of the runs, in order of completion
+    """
+    if not output_path.endswith((".csv", ".npz")):
+        raise ValueError("The output file must be a .csv or a .npz file")
+
+    grid = list(itertools.product(agent_counts, engine_counts, seeds, step_budgets))
+    results = []
+
+    with open(output_path, "w", newline="") if output_path.endswith(".csv") else nullcontext() as csv_file, \
+            ProcessPoolExecutor(max_workers=max_workers) as executor:
+        writer = None
+        if csv_file is not None:
+            writer = csv.DictWriter(csv_file, fieldnames=RESULT_FIELDS)
+            writer.writeheader()
+
+        futures = [executor.submit(run_single, *parameters) for parameters in grid]
+        for future in as_completed(futures):
+            result = future.result()
+            results.append(result)
+
+            if writer is not None:
+                writer.writerow(result)
+                csv_file.flush()
+
+    if output_path.endswith(".npz"):
+        np.savez(output_path, **{field: np.array([result[field] for result in results]) for field in RESULT_FIELDS})
+
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Runs ArgumentModel over a grid of parameters.")
+    parser.add_argument("--agents", type=int, nargs="+", default=[2], help="numbers of agents")
+    parser.add_argument("--engines", type=int, nargs="+", default=[10], help="numbers of engines")
+    parser.add_argument("--seeds", type=int, nargs="+", default=[0], help="seeds")
+    parser.add_argument("--steps", type=int, nargs="+", default=[100], help="step budgets")
+    parser.add_argument("--output", default="sweep.csv", help="output file (.csv or .npz)")
+    parser.add_argument("--workers", type=int, default=None, help="number of processes (all cores by default)")
+    arguments = parser.parse_args()
+
+    sweep_results = run_sweep(arguments.agents, arguments.engines, arguments.seeds, arguments.steps,
+                              arguments.output, arguments.workers)
+    print("[INFO] {} runs written to {}".format(len(sweep_results), arguments.output))
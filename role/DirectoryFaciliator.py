@@ -1,28 +1,69 @@
+from role.InterlocutorView import InterlocutorView
 from role.Role import Role
-from typing import Dict, List, Set
+from role.Topology import EdgeListTopology, RingTopology, Topology
+from typing import Dict, FrozenSet, List, Tuple
 
 
 class DirectoryFacilitator:
     def __init__(self):
         self.df_: Dict[Role, List] = dict()
+        # The members of each role, as a tuple (attach order) and a frozenset, rebuilt when the role changes
+        self.__members: Dict[Role, Tuple[Tuple, FrozenSet]] = dict()
+        # The interaction graph of each role, and the neighbours of each member built from it when the role changes
+        self.__topologies: Dict[Role, Topology] = dict()
+        self.__neighbours: Dict[Role, Dict[str, Tuple[Tuple, FrozenSet]]] = dict()
 
     def add_role(self, role: Role):
         """
         Add a specific role in df_
         """
         self.df_[role] = []
+        self.__members.pop(role, None)
+        self.__neighbours.pop(role, None)
+
+    def set_topology(self, role: Role, topology: Topology = None):
+        """
+        Restrict the agents having a specific role to talk to their neighbours in an interaction graph. Every member
+        talks to every other one if topology is None. The graph is built again when an agent is attached to the role.
+        """
+        if topology is None:
+            self.__topologies.pop(role, None)
+        else:
+            self.__topologies[role] = topology
+        self.__neighbours.pop(role, None)
 
     def attach_a_role_to_agent(self, role: Role, agent_id: str):
         """
         Permits to indicate that a specific agent can achieve a specific role.
         """
         self.df_[role].append(agent_id)
+        self.__members.pop(role, None)
+        self.__neighbours.pop(role, None)
 
-    def get_agents_with_specific_role(self, requester_id: str, role: Role) -> Set[str]:
+    def get_agents_with_specific_role(self, requester_id: str, role: Role) -> InterlocutorView:
         """
-        Return a list of agents with a specific role.
+        Return the set of agents with a specific role, except the requester. If the role has a topology, only the
+        neighbours of the requester are returned (none if the requester does not have the role).
+
+        The set is a view over the members of the role, shared by all requesters: it is created in O(1) and can be
+        modified with remove() without affecting the other views.
         """
-        return set([agent_id for agent_id in self.df_[role] if agent_id != requester_id])
+        members = self.__members.get(role)
+        if members is None:
+            member_list = tuple(dict.fromkeys(self.df_[role]))
+            members = self.__members[role] = (member_list, frozenset(member_list))
+
+        topology = self.__topologies.get(role)
+        if topology is not None:
+            neighbours = self.__neighbours.get(role)
+            if neighbours is None:
+                neighbours = self.__neighbours[role] = {
+                    member: (member_neighbours, frozenset(member_neighbours))
+                    for member, member_neighbours in topology.build(members[0]).items()
+                }
+            members = neighbours.get(requester_id, ((), frozenset()))
+
+        return InterlocutorView(members[0], members[1], requester_id)
 
 
 if __name__ == '__main__':
@@ -57,3 +98,34 @@ if __name__ == '__main__':
     assert len(interlocutors) == 1
     assert list(interlocutors)[0] == agent_2
     print("[INFO] Method get_agents_with_specific_role should return 2 agents... OK")
+
+    # The views are shared but removing an agent from one of them does not affect the others
+    agent_3 = 2
+    df.attach_a_role_to_agent(Role.EnginesTalker, agent_3)
+
+    interlocutors = df.get_agents_with_specific_role(agent_1, Role.EnginesTalker)
+    other_interlocutors = df.get_agents_with_specific_role(agent_1, Role.EnginesTalker)
+
+    assert list(interlocutors) == [agent_2, agent_3]
+    interlocutors.remove(agent_2)
+    assert list(interlocutors) == [agent_3] and len(interlocutors) == 1 and agent_2 not in interlocutors
+    assert other_interlocutors == {agent_2, agent_3}
+    assert df.get_agents_with_specific_role(agent_3, Role.EnginesTalker) == {agent_1, agent_2}
+    print("[INFO] Method get_agents_with_specific_role should return independent views... OK")
+
+    # Restricting the interlocutors to the neighbours in an interaction graph
+    agent_4 = 3
+    df.attach_a_role_to_agent(Role.EnginesTalker, agent_4)
+    df.set_topology(Role.EnginesTalker, RingTopology(2))
+
+    assert list(df.get_agents_with_specific_role(agent_1, Role.EnginesTalker)) == [agent_2, agent_4]
+    assert list(df.get_agents_with_specific_role(agent_3, Role.EnginesTalker)) == [agent_2, agent_4]
+    assert len(df.get_agents_with_specific_role(4, Role.EnginesTalker)) == 0
+
+    df.set_topology(Role.EnginesTalker, EdgeListTopology([(agent_1, agent_3)]))
+    assert list(df.get_agents_with_specific_role(agent_1, Role.EnginesTalker)) == [agent_3]
+    assert len(df.get_agents_with_specific_role(agent_2, Role.EnginesTalker)) == 0
+
+    df.set_topology(Role.EnginesTalker, None)
+    assert len(df.get_agents_with_specific_role(agent_1, Role.EnginesTalker)) == 3
+    print("[INFO] Method get_agents_with_specific_role should return the neighbours in the topology... OK")
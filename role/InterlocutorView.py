@@ -0,0 +1,63 @@
+from collections.abc import Set as AbstractSet
+from typing import FrozenSet, Iterator, Tuple
+
+
+class InterlocutorView(AbstractSet):
+    """
+    Set of the agents having a role, seen by one requester: the requester itself is left out.
+
+    The view shares the members of the role with every other view handed out by the DirectoryFacilitator and never
+    modifies them. Removing an agent from the view only records it in a set of removed agents owned by the view, so
+    creating a view costs O(1) and removing an agent costs O(1) as well. The agents are iterated in the order in which
+    they were attached to the role.
+    """
+
+    __slots__ = ('__members', '__member_set', '__requester_id', '__removed')
+
+    def __init__(self, members: Tuple, member_set: FrozenSet, requester_id):
+        self.__members = members
+        self.__member_set = member_set
+        self.__requester_id = requester_id
+        self.__removed = None
+
+    def __contains__(self, agent_id) -> bool:
+        return agent_id != self.__requester_id and agent_id in self.__member_set \
+            and (self.__removed is None or agent_id not in self.__removed)
+
+    def __iter__(self) -> Iterator:
+        requester_id = self.__requester_id
+        removed = self.__removed
+
+        for agent_id in self.__members:
+            if agent_id != requester_id and (removed is None or agent_id not in removed):
+                yield agent_id
+
+    def __len__(self) -> int:
+        length = len(self.__member_set)
+        if self.__requester_id in self.__member_set:
+            length -= 1
+        if self.__removed is not None:
+            length -= len(self.__removed)
+        return length
+
+    def __repr__(self) -> str:
+        return "InterlocutorView({})".format(list(self))
+
+    def remove(self, agent_id):
+        """
+        Remove an agent from the view, raising a KeyError if it is not in the view.
+        """
+        if agent_id not in self:
+            raise KeyError(agent_id)
+
+        # The members are shared with the other views, the removed agents are recorded on the side
+        if self.__removed is None:
+            self.__removed = set()
+        self.__removed.add(agent_id)
+
+    def discard(self, agent_id):
+        """
+        Remove an agent from the view if it is in it.
+        """
+        if agent_id in self:
+            self.remove(agent_id)
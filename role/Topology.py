@@ -0,0 +1,247 @@
+from abc import ABC, abstractmethod
+from typing import Dict, Hashable, Iterable, List, Set, Tuple
+
+import random
+
+
+class Topology(ABC):
+    """
+    Interaction graph restricting the agents a member of a role can talk to.
+
+    A topology is given the members of a role, in the order in which they were attached to it, and returns the
+    neighbours of each member. The graph is undirected: if an agent is a neighbour of another one, the converse is true.
+    """
+
+    @abstractmethod
+    def build(self, members: Tuple) -> Dict[Hashable, Tuple]:
+        """
+        Returns the neighbours of each member, in the order in which they were attached to the role.
+        """
+
+
+class RingTopology(Topology):
+    """
+    Ring lattice: each member is linked to the degree / 2 members attached before it and after it.
+    """
+
+    def __init__(self, degree: int = 2):
+        if degree < 2 or degree % 2 != 0:
+            raise ValueError("The degree of a ring must be an even number greater than 1")
+        self.__degree = degree
+
+    def build(self, members):
+        return _neighbours_from_adjacency(members, _ring_adjacency(len(members), self.__degree))
+
+
+class RandomRegularTopology(Topology):
+    """
+    Random graph in which every member has exactly degree neighbours.
+
+    The edges are drawn by pairing the degree stubs of each member at random, rejecting the pairs that would create a
+    loop or a double edge, and restarting when the remaining stubs cannot be paired anymore. This is fast as long as the
+    degree is small compared to the number of members. The role needs more members than the degree.
+    """
+
+    MAX_ATTEMPTS = 100
+    MAX_REJECTED_PAIRS = 100
+
+    def __init__(self, degree: int, seed: int = None):
+        if degree < 1:
+            raise ValueError("The degree of a random regular graph must be positive")
+        self.__degree = degree
+        self.__seed = seed
+
+    def build(self, members):
+        return _neighbours_from_adjacency(members, self.__build_adjacency(len(members)))
+
+    def __build_adjacency(self, members_count: int) -> List[Set[int]]:
+        """
+        Returns the indices of the neighbours of each member, given the number of members.
+        """
+        degree = self.__degree
+        if members_count <= degree:
+            raise ValueError("A random regular graph of degree {} needs more than {} members"
+                             .format(degree, members_count))
+        if members_count == degree + 1:
+            # The complete graph is the only regular graph of this degree
+            return _complete_adjacency(members_count)
+        if members_count * degree % 2 != 0:
+            raise ValueError("A random regular graph needs an even number of stubs (members x degree)")
+
+        rng = random.Random(self.__seed)
+
+        for _ in range(RandomRegularTopology.MAX_ATTEMPTS):
+            stubs = [position for position in range(members_count) for _ in range(degree)]
+            adjacency = [set() for _ in range(members_count)]
+            rejected_pairs = 0
+
+            while len(stubs) > 0 and rejected_pairs < RandomRegularTopology.MAX_REJECTED_PAIRS:
+                index_1 = rng.randrange(len(stubs))
+                index_2 = rng.randrange(len(stubs))
+                position_1, position_2 = stubs[index_1], stubs[index_2]
+
+                if position_1 == position_2 or position_2 in adjacency[position_1]:
+                    rejected_pairs += 1
+                    continue
+
+                rejected_pairs = 0
+                adjacency[position_1].add(position_2)
+                adjacency[position_2].add(position_1)
+
+                # Removing the two stubs by swapping them with the last ones, the highest index first
+                for index in sorted((index_1, index_2), reverse=True):
+                    stubs[index] = stubs[-1]
+                    stubs.pop()
+
+            if len(stubs) == 0:
+                return adjacency
+
+        raise ValueError("Could not draw a random regular graph of degree {} with {} members"
+                         .format(degree, members_count))
+
+
+class SmallWorldTopology(Topology):
+    """
+    Watts-Strogatz small world: a ring lattice of the given degree whose edges are each rewired to a random member with
+    probability rewiring_probability.
+    """
+
+    def __init__(self, degree: int = 4, rewiring_probability: float = 0.1, seed: int = None):
+        if degree < 2 or degree % 2 != 0:
+            raise ValueError("The degree of a small world must be an even number greater than 1")
+        if not 0 <= rewiring_probability <= 1:
+            raise ValueError("The rewiring probability must be between 0 and 1")
+        self.__degree = degree
+        self.__rewiring_probability = rewiring_probability
+        self.__seed = seed
+
+    def build(self, members):
+        return _neighbours_from_adjacency(members, self.__build_adjacency(len(members)))
+
+    def __build_adjacency(self, members_count: int) -> List[Set[int]]:
+        """
+        Returns the indices of the neighbours of each member, given the number of members.
+        """
+        adjacency = _ring_adjacency(members_count, self.__degree)
+        if members_count <= self.__degree + 1:
+            return adjacency
+
+        rng = random.Random(self.__seed)
+
+        for distance in range(1, self.__degree // 2 + 1):
+            for position in range(members_count):
+                neighbour = (position + distance) % members_count
+
+                if rng.random() >= self.__rewiring_probability or neighbour not in adjacency[position]:
+                    continue
+
+                # Members already linked to every other one keep their edges
+                if len(adjacency[position]) >= members_count - 1:
+                    continue
+
+                new_neighbour = rng.randrange(members_count)
+                while new_neighbour == position or new_neighbour in adjacency[position]:
+                    new_neighbour = rng.randrange(members_count)
+
+                adjacency[position].discard(neighbour)
+                adjacency[neighbour].discard(position)
+                adjacency[position].add(new_neighbour)
+                adjacency[new_neighbour].add(position)
+
+        return adjacency
+
+
+class EdgeListTopology(Topology):
+    """
+    Graph given by an explicit list of (agent, agent) edges. The edges involving an agent which is not a member of the
+    role are ignored.
+    """
+
+    def __init__(self, edges: Iterable[Tuple[Hashable, Hashable]]):
+        self.__edges = list(edges)
+
+    def build(self, members):
+        neighbours = {member: set() for member in members}
+
+        for agent_1, agent_2 in self.__edges:
+            if agent_1 != agent_2 and agent_1 in neighbours and agent_2 in neighbours:
+                neighbours[agent_1].add(agent_2)
+                neighbours[agent_2].add(agent_1)
+
+        return {member: tuple(agent for agent in members if agent in neighbours[member]) for member in members}
+
+
+def _neighbours_from_adjacency(members: Tuple, adjacency: List[Set[int]]) -> Dict[Hashable, Tuple]:
+    """
+    Returns the neighbours of each member from the indices of its neighbours, in the order in which they were attached
+    to the role.
+    """
+    return {member: tuple(members[index] for index in sorted(adjacency[position]))
+            for position, member in enumerate(members)}
+
+
+def _complete_adjacency(members_count: int) -> List[Set[int]]:
+    """
+    Returns the adjacency of the complete graph.
+    """
+    return [set(range(members_count)) - {position} for position in range(members_count)]
+
+
+def _ring_adjacency(members_count: int, degree: int) -> List[Set[int]]:
+    """
+    Returns the adjacency of the ring lattice in which each member is linked to its degree / 2 closest members on each
+    side.
+    """
+    if members_count <= degree + 1:
+        return _complete_adjacency(members_count)
+
+    adjacency = [set() for _ in range(members_count)]
+    for position in range(members_count):
+        for distance in range(1, degree // 2 + 1):
+            neighbour = (position + distance) % members_count
+            adjacency[position].add(neighbour)
+            adjacency[neighbour].add(position)
+    return adjacency
+
+
+if __name__ == '__main__':
+    members = tuple("Agent " + str(index) for index in range(10))
+
+    def assert_undirected(neighbours):
+        for member, member_neighbours in neighbours.items():
+            assert member not in member_neighbours
+            for neighbour in member_neighbours:
+                assert member in neighbours[neighbour]
+
+    ring = RingTopology(2).build(members)
+    assert_undirected(ring)
+    assert ring["Agent 0"] == ("Agent 1", "Agent 9")
+    assert all(len(neighbours) == 2 for neighbours in ring.values())
+    print("[INFO] Testing ring topology... OK")
+
+    regular = RandomRegularTopology(3, seed=0).build(members)
+    assert_undirected(regular)
+    assert all(len(neighbours) == 3 for neighbours in regular.values())
+    assert regular == RandomRegularTopology(3, seed=0).build(members)
+    assert RandomRegularTopology(2).build(members[:3])["Agent 0"] == ("Agent 1", "Agent 2")
+    too_few_members = False
+    try:
+        RandomRegularTopology(3).build(members[:3])
+    except ValueError:
+        too_few_members = True
+    assert too_few_members
+    print("[INFO] Testing random regular topology... OK")
+
+    small_world = SmallWorldTopology(4, 0.5, seed=0).build(members)
+    assert_undirected(small_world)
+    assert sum(len(neighbours) for neighbours in small_world.values()) == 10 * 4
+    assert small_world != RingTopology(4).build(members)
+    print("[INFO] Testing small world topology... OK")
+
+    edges = EdgeListTopology([("Agent 0", "Agent 1"), ("Agent 2", "Agent 0"), ("Agent 0", "Unknown")]).build(members)
+    assert_undirected(edges)
+    assert edges["Agent 0"] == ("Agent 1", "Agent 2") and edges["Agent 3"] == ()
+    print("[INFO] Testing edge list topology... OK")
+
+    assert RingTopology(4).build(members[:3])["Agent 0"] == ("Agent 1", "Agent 2")
+    print("[INFO] Testing topologies with few members... OK")
@@ -3,14 +3,28 @@
 Testing all the functionalities of the communication package.
 """
 
+import os
+import tempfile
+
 from mesa import Model
 from mesa.time import RandomActivation
 
 from communication.agent.CommunicatingAgent import CommunicatingAgent
+from communication.agent.EventDrivenActivation import EventDrivenActivation
 from communication.mailbox.Mailbox import Mailbox
+from communication.mailbox.RetentionPolicy import DropEndedNegotiationRetention, KeepLastPerSenderRetention, \
+    KeepLastRetention
 from communication.message.Message import Message
 from communication.message.MessagePerformative import MessagePerformative
+from communication.message.MessageCodec import MessageCodec
 from communication.message.MessageService import MessageService
+from communication.message.TraceSink import BufferedFileTraceSink, FilteredTraceSink, RingBufferTraceSink
+from communication.arguments.Argument import Argument
+from communication.arguments.ArgumentCodec import ArgumentCodec
+from communication.preferences.CriterionName import CriterionName
+from communication.preferences.Item import Item
+from communication.preferences.ItemCatalog import ItemCatalog
+from communication.preferences.Value import Value
 
 
 class TestAgent(CommunicatingAgent):
@@ -18,16 +32,18 @@ class TestAgent(CommunicatingAgent):
     """
     def __init__(self, unique_id, model, name):
         super().__init__(unique_id, model, name)
+        self.steps_count = 0
 
     def step(self):
         super().step()
+        self.steps_count += 1
 
 
 class TestModel(Model):
     """ TestModel which inherit from Model to test CommunicatingAgent and MessageService.
     """
-    def __init__(self):
-        self.schedule = RandomActivation(self)
+    def __init__(self, event_driven=False):
+        self.schedule = EventDrivenActivation(self) if event_driven else RandomActivation(self)
         self.__messages_service = MessageService(self.schedule)
         for i in range(2):
             a = TestAgent(i, self, "Agent" + str(i))
@@ -53,6 +69,11 @@ if __name__ == "__main__":
     mailbox.receive_messages(m2)
 
     assert(len(mailbox.get_new_messages()) == 2)
+    other_mailbox = Mailbox()
+    no_new_messages = other_mailbox.get_new_messages()
+    other_mailbox.receive_messages(m3)
+    assert(no_new_messages == [])
+    assert(other_mailbox.get_new_messages() == [m3])
     print("*     get_new_messages() => OK")
     assert(len(mailbox.get_messages()) == 2)
     print("*     get_messages() => OK")
@@ -107,3 +128,200 @@ if __name__ == "__main__":
     assert(len(agent1.get_messages()) == 4)
     print("*     send_message() & dispatch_messages => OK")
 
+    agent0.send_message(Message("Agent0", "Agent2", MessagePerformative.COMMIT, "Bonjour"))
+    agent0.send_message(Message("Agent0", "Agent1", MessagePerformative.COMMIT, "Bonjour"))
+    unknown_agent_found = True
+    try:
+        MessageService.get_instance().dispatch_messages()
+    except LookupError:
+        unknown_agent_found = False
+    assert(not unknown_agent_found)
+    assert(len(agent1.get_new_messages()) == 1)
+    assert(not MessageService.get_instance().has_pending_messages())
+    print("*     dispatch_messages() with an unknown agent => OK")
+
+    print("* 3) Testing MessageService agent index")
+
+    assert(MessageService.get_instance().find_agent_from_name("Agent1") is agent1)
+    print("*     find_agent_from_name() => OK")
+
+    MessageService.get_instance().set_instant_delivery(True)
+    unknown_agent_found = True
+    try:
+        agent0.send_message(Message("Agent0", "Agent2", MessagePerformative.COMMIT, "Bonjour"))
+    except LookupError:
+        unknown_agent_found = False
+    assert(not unknown_agent_found)
+    print("*     send_message() to an unknown agent => OK")
+
+    agent2 = TestAgent(2, communicating_model, "Agent2")
+    communicating_model.schedule.add(agent2)
+    agent0.send_message(Message("Agent0", "Agent2", MessagePerformative.COMMIT, "Bonjour"))
+    assert(len(agent2.get_new_messages()) == 1)
+    communicating_model.schedule.remove(agent2)
+    removed_agent_found = True
+    try:
+        agent0.send_message(Message("Agent0", "Agent2", MessagePerformative.COMMIT, "Bonjour"))
+    except LookupError:
+        removed_agent_found = False
+    assert(not removed_agent_found)
+    print("*     send_message() to an agent removed from the scheduler => OK")
+
+    print("* 4) Testing trace sinks")
+
+    ring_buffer = RingBufferTraceSink(capacity=2)
+    MessageService.get_instance().set_trace_sink(FilteredTraceSink(ring_buffer, [MessagePerformative.COMMIT]))
+
+    agent0.send_message(Message("Agent0", "Agent1", MessagePerformative.PROPOSE, "Bonjour"))
+    for i in range(3):
+        agent0.send_message(Message("Agent0", "Agent1", MessagePerformative.COMMIT, str(i)))
+
+    assert(ring_buffer.get_lines() == ["From Agent0 to Agent1 (COMMIT) 1", "From Agent0 to Agent1 (COMMIT) 2"])
+    print("*     FilteredTraceSink & RingBufferTraceSink => OK")
+
+    trace_path = os.path.join(tempfile.mkdtemp(), "trace.txt")
+    MessageService.get_instance().set_trace_sink(BufferedFileTraceSink(trace_path, buffer_size=10))
+    agent0.send_message(Message("Agent0", "Agent1", MessagePerformative.COMMIT, "Bonjour"))
+    MessageService.get_instance().close()
+    MessageService.get_instance().set_trace_sink(None)
+
+    with open(trace_path, encoding="utf-8") as trace_file:
+        assert(trace_file.read() == "From Agent0 to Agent1 (COMMIT) Bonjour\n")
+    print("*     BufferedFileTraceSink written on close() => OK")
+
+    print("* 5) Testing Mailbox indexes")
+
+    mailbox = Mailbox()
+    mailbox.receive_messages(m1)
+    mailbox.receive_messages(m2)
+    mailbox.get_new_messages()
+    mailbox.receive_messages(m3)
+    mailbox.receive_messages(m1)
+
+    assert(mailbox.get_messages_from_exp("Agent1") == [m1, m2, m1])
+    assert(mailbox.get_messages_from_exp("Agent3") == [])
+    assert(mailbox.get_messages_from_performative(MessagePerformative.PROPOSE) == [m1, m1])
+    print("*     messages in order of arrival, read or unread => OK")
+
+    print("* 6) Testing Mailbox retention policies")
+
+    mailbox = Mailbox(KeepLastRetention(2))
+    for message in [m1, m2, m3]:
+        mailbox.receive_messages(message)
+    assert(len(mailbox.get_new_messages()) == 3)
+    assert(mailbox.get_messages() == [m2, m3])
+    assert(mailbox.get_messages_from_exp("Agent1") == [m2])
+    assert(mailbox.get_messages_from_performative(MessagePerformative.PROPOSE) == [])
+    assert(mailbox.get_retained_messages_count() == 2)
+    assert(mailbox.get_peak_retained_messages_count() == 3)
+    print("*     KeepLastRetention => OK")
+
+    mailbox = Mailbox(KeepLastPerSenderRetention(1))
+    for message in [m1, m2, m3]:
+        mailbox.receive_messages(message)
+    assert(mailbox.get_messages() == [m2, m3])
+    print("*     KeepLastPerSenderRetention => OK")
+
+    ended_negotiations = set()
+    mailbox = Mailbox(DropEndedNegotiationRetention(lambda exp: exp in ended_negotiations))
+    for message in [m1, m2, m3]:
+        mailbox.receive_messages(message)
+    assert(len(mailbox.get_messages()) == 3)
+    ended_negotiations.add("Agent1")
+    mailbox.get_new_messages()
+    assert(mailbox.get_messages() == [m3])
+    print("*     DropEndedNegotiationRetention => OK")
+
+    print("* 7) Testing Mailbox read chunks")
+
+    mailbox = Mailbox(KeepLastPerSenderRetention(2))
+    for i in range(10):
+        mailbox.receive_messages(Message("Agent" + str(i % 3), "Agent9", MessagePerformative.ARGUE, str(i)))
+        if i % 4 == 3:
+            new_messages = mailbox.get_new_messages()
+            assert(len(new_messages) == 4)
+    assert([message.get_content() for message in mailbox.get_messages()] == ["4", "5", "6", "7", "8", "9"])
+    assert(mailbox.get_retained_messages_count() == 6)
+    assert([message.get_content() for message in mailbox.get_messages_from_exp("Agent0")] == ["6", "9"])
+    print("*     get_new_messages() hands out the unread list => OK")
+
+    print("* 8) Testing batched dispatch")
+
+    MessageService.get_instance().set_instant_delivery(False)
+
+    agent0.send_message(Message("Agent0", "Agent1", MessagePerformative.QUERY_REF, "1"))
+    agent1.send_message(Message("Agent1", "Agent0", MessagePerformative.QUERY_REF, "2"))
+    agent0.send_message(Message("Agent0", "Agent1", MessagePerformative.QUERY_REF, "3"))
+    agent0.get_new_messages()
+    agent1.get_new_messages()
+
+    communicating_model.step()
+
+    assert([message.get_content() for message in agent1.get_new_messages()] == ["1", "3"])
+    assert([message.get_content() for message in agent0.get_new_messages()] == ["2"])
+    assert(len(agent1.get_messages_from_performative(MessagePerformative.QUERY_REF)) == 2)
+    print("*     dispatch_messages() delivers one batch per agent => OK")
+
+    print("* 9) Testing several models in the same process")
+
+    other_model = TestModel()
+    other_agent0 = other_model.schedule.agents[0]
+    other_agent1 = other_model.schedule.agents[1]
+
+    other_agent0.send_message(Message("Agent0", "Agent1", MessagePerformative.COMMIT, "Bonjour"))
+    agent0.send_message(Message("Agent0", "Agent1", MessagePerformative.COMMIT, "Bonjour"))
+
+    assert(len(other_agent1.get_new_messages()) == 1)
+    assert(len(agent1.get_new_messages()) == 0)
+    communicating_model.step()
+    assert(len(agent1.get_new_messages()) == 1)
+    assert(len(other_agent1.get_new_messages()) == 0)
+    print("*     each model delivers its own messages => OK")
+
+    print("* 10) Testing the event driven scheduler")
+
+    event_driven_model = TestModel(event_driven=True)
+    agent0 = event_driven_model.schedule.agents[0]
+    agent1 = event_driven_model.schedule.agents[1]
+
+    event_driven_model.step()
+    assert(agent0.steps_count == 1 and agent1.steps_count == 1)
+    assert(event_driven_model.schedule.get_awake_agent_count() == 0)
+    event_driven_model.step()
+    assert(agent0.steps_count == 1 and agent1.steps_count == 1)
+    print("*     agents without pending work are not activated => OK")
+
+    agent0.send_message(Message("Agent0", "Agent1", MessagePerformative.PROPOSE, "Bonjour"))
+    assert(event_driven_model.schedule.get_awake_agent_count() == 1)
+    event_driven_model.step()
+    assert(agent0.steps_count == 1 and agent1.steps_count == 2)
+    event_driven_model.step()
+    assert(agent1.steps_count == 3)
+    agent1.get_new_messages()
+    event_driven_model.step()
+    assert(agent1.steps_count == 4)
+    assert(event_driven_model.schedule.get_awake_agent_count() == 0)
+    print("*     delivering a message wakes its receiver until it is read => OK")
+
+    print("* 11) Testing the message codec")
+
+    engine = Item("Electric Engine", "A very quiet engine")
+    argument = Argument(False, engine)
+    argument.add_premiss_couple_values(CriterionName.NOISE, Value.VERY_BAD)
+    argument.add_premiss_comparison(CriterionName.NOISE, CriterionName.CONSUMPTION)
+    messages = [Message("Agent0", "Agent1", MessagePerformative.PROPOSE, engine),
+                Message("Agent1", "Agent0", MessagePerformative.ARGUE, argument),
+                Message("Agent0", "Agent1", MessagePerformative.QUERY_REF, "engine é"),
+                Message("Agent1", "Agent2", MessagePerformative.COMMIT, None)]
+
+    item_catalog = ItemCatalog([engine])
+    codec = MessageCodec(["Agent0", "Agent1"], ArgumentCodec(item_catalog))
+    buffer = codec.encode_batch(messages)
+    decoding_codec = MessageCodec(codec.get_agent_names(), ArgumentCodec(item_catalog))
+    decoded_messages = decoding_codec.decode_batch(memoryview(buffer))
+
+    assert([str(message) for message in decoded_messages] == [str(message) for message in messages])
+    assert(decoded_messages[0].get_content() is engine)
+    assert(decoded_messages[1].get_content() == argument)
+    assert(decoding_codec.decode(codec.encode(messages[2])).get_content() == "engine é")
+    print("*     encode_batch() & decode_batch() => OK")